@@ -1,7 +1,14 @@
 import os
+from datetime import timedelta
 from flask import Flask
 from app.resume_parser import ResumeParser
 from app.database import DatabaseManager
+from app.job_index import JobIndex
+from app.matching_engine import MatchingEngine
+from app import nlp_registry
+from app.task_queue import ResumeTaskQueue
+from app.api_cache import ResponseCache
+from app import metrics
 
 UPLOAD_FOLDER = 'uploads'
 if not os.path.exists(UPLOAD_FOLDER):
@@ -15,7 +22,18 @@ def create_app(test_config=None):
         SECRET_KEY='dev',
         UPLOAD_FOLDER=UPLOAD_FOLDER,
         MAX_CONTENT_LENGTH=16 * 1024 * 1024,  # 16MB max-limit
-        DATABASE_PATH=os.path.join(app.instance_path, 'resume_matcher.db')
+        DATABASE_PATH=os.path.join(app.instance_path, 'resume_matcher.db'),
+        NLP_WARMUP=False,  # load spaCy at startup instead of on the first request
+        NLP_PRELOAD=False,  # warm up and gc.freeze() before a pre-fork server forks workers
+        UPLOAD_WORKERS=2,  # threads parsing queued resume uploads
+        PARSE_MODE='full',  # 'fast' skips the statistical spaCy pipeline when parsing resumes
+        MIN_SHARED_SKILLS=1,  # only score jobs sharing this many skills with a resume (0 scores all)
+        JOB_SEARCH_MAX_AGE=timedelta(hours=24),  # local search results older than this are refreshed live
+        API_CACHE_TTL=900,  # seconds an Adzuna response is reused (0 disables the cache)
+        API_CACHE_SIZE=1024,  # responses kept in memory per process
+        PROFILE_REQUESTS=False,  # allow cProfile dumps of sampled or X-Profile requests
+        PROFILE_SAMPLE_RATE=0.0,  # fraction of requests profiled without the X-Profile header
+        PROFILE_MIN_SECONDS=0.5  # only requests at least this slow are dumped
     )
 
     if test_config is None:
@@ -25,20 +43,60 @@ def create_app(test_config=None):
         # Load the test config if passed in
         app.config.from_mapping(test_config)
 
+    # Keep the job index next to the database unless configured otherwise
+    app.config.setdefault(
+        'JOB_INDEX_PATH',
+        os.path.join(os.path.dirname(app.config['DATABASE_PATH']), 'job_index.pkl')
+    )
+    # Cached API responses on disk are shared by every worker process
+    app.config.setdefault(
+        'API_CACHE_PATH',
+        os.path.join(os.path.dirname(app.config['DATABASE_PATH']), 'api_cache.db')
+    )
+
     # Ensure the instance folder exists
     try:
         os.makedirs(app.instance_path)
     except OSError:
         pass
 
+    # Share one spaCy model between the parser and the matching engine. Preloading runs before any
+    # database connection or thread exists, so forked workers inherit only the models.
+    if app.config['NLP_PRELOAD']:
+        nlp_registry.preload()
+    elif app.config['NLP_WARMUP']:
+        nlp_registry.warmup()
+
     # Initialize database
     db_manager = DatabaseManager(app.config['DATABASE_PATH'])
     app.db_manager = db_manager
 
     # Initialize ResumeParser
-    resume_parser = ResumeParser(db_manager)
+    resume_parser = ResumeParser(db_manager, mode=app.config['PARSE_MODE'])
     app.resume_parser = resume_parser
 
+    # Parse uploads in the background; the queue is persisted in the database. Under a pre-fork
+    # server each worker starts its own pool on its first request.
+    app.resume_queue = ResumeTaskQueue(db_manager, resume_parser, workers=app.config['UPLOAD_WORKERS'],
+                                       start=not app.config['NLP_PRELOAD'])
+    app.before_request(app.resume_queue.start)
+
+    # Cache Adzuna responses in front of every scraper the app builds
+    app.api_cache = ResponseCache(max_entries=app.config['API_CACHE_SIZE'], ttl=app.config['API_CACHE_TTL'],
+                                  path=app.config['API_CACHE_PATH'])
+
+    # Load the precomputed job-corpus TF-IDF index
+    app.job_index = JobIndex.load(app.config['JOB_INDEX_PATH'])
+
+    # Keep the job index in step with jobs written to the database
+    matching_engine = MatchingEngine(job_index=app.job_index, db_manager=db_manager,
+                                     min_shared_skills=app.config['MIN_SHARED_SKILLS'])
+    db_manager.add_job_listener(matching_engine.index_jobs)
+    app.matching_engine = matching_engine
+
+    # Request latency histograms and opt-in request profiling
+    metrics.init_app(app)
+
     # Register blueprints
     from app import main
     app.register_blueprint(main.bp)
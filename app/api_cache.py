@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from sqlalchemy import create_engine, event, text
+from app.database import dispose_after_fork
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """TTL + LRU cache for upstream API responses.
+
+    Entries live in memory, bounded to ``max_entries`` and evicted least
+    recently used first. With ``path`` set, responses are also written as JSON
+    to a SQLite file, so every worker process serving the app shares them.
+    Concurrent misses on the same key are coalesced: one caller fetches and
+    the others wait for its result.
+    """
+
+    def __init__(self, max_entries=1024, ttl=900, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._in_flight = {}  # key -> Future of the fetch in progress
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        self.engine = None
+        if path:
+            self.engine = dispose_after_fork(
+                create_engine(f"sqlite:///{path}", connect_args={'check_same_thread': False, 'timeout': 30})
+            )
+            event.listen(self.engine, 'connect', self._configure_connection)
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    "CREATE TABLE IF NOT EXISTS api_cache "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                ))
+                conn.execute(text("DELETE FROM api_cache WHERE expires_at <= :now"), {'now': time.time()})
+
+    @staticmethod
+    def _configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    @staticmethod
+    def make_key(*parts):
+        return json.dumps(parts, separators=(',', ':'))
+
+    def get(self, key):
+        """The cached value for ``key``, or None if it is missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        if self.engine is not None:
+            try:
+                with self.engine.connect() as conn:
+                    row = conn.execute(
+                        text("SELECT value, expires_at FROM api_cache WHERE key = :key AND expires_at > :now"),
+                        {'key': key, 'now': now}
+                    ).fetchone()
+            except Exception as e:
+                logger.error(f"Error reading API cache: {str(e)}")
+                row = None
+            if row is not None:
+                value = json.loads(row.value)
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store(key, value, row.expires_at)
+                return value
+        return None
+
+    def set(self, key, value, persist=True):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+        if persist and self.engine is not None:
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(text("""
+                        INSERT INTO api_cache (key, value, expires_at) VALUES (:key, :value, :expires_at)
+                        ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at
+                    """), {'key': key, 'value': json.dumps(value), 'expires_at': expires_at})
+            except Exception as e:
+                logger.error(f"Error writing API cache: {str(e)}")
+
+    def _store(self, key, value, expires_at):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_fetch(self, key, fetch, persist=True):
+        """Return the cached value for ``key``, calling ``fetch()`` once on a miss.
+
+        Callers missing on a key that is already being fetched wait for that
+        fetch instead of starting their own. None results are not cached, so
+        failed requests are retried next time.
+        """
+        if self.ttl <= 0:
+            return fetch()
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            value = fetch()
+            if value is not None:
+                self.set(key, value, persist=persist)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.engine is not None:
+            with self.engine.begin() as conn:
+                conn.execute(text("DELETE FROM api_cache"))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced
+            }
+
+    def close(self):
+        if self.engine is not None:
+            self.engine.dispose()
+
+
+_response_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide ResponseCache configured from API_CACHE_TTL and API_CACHE_PATH if set."""
+    global _response_cache
+    if _response_cache is None:
+        with _cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(ttl=float(os.getenv('API_CACHE_TTL', 900)),
+                                                path=os.getenv('API_CACHE_PATH'))
+    return _response_cache
@@ -0,0 +1,266 @@
+import os
+import time
+import logging
+import tarfile
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+import typer
+from app.database import DatabaseManager
+from app.job_index import JobIndex
+from app.matching_engine import MatchingEngine
+from app.resume_parser import ResumeParser
+
+logger = logging.getLogger(__name__)
+
+cli = typer.Typer(help="Resume Matcher command-line tools.")
+
+STAGES = ('read', 'extract', 'nlp', 'store')
+
+# The parser of an import worker process, built once by _init_worker
+_parser = None
+
+
+def _init_worker(mode):
+    global _parser
+    # Workers already run in parallel, so each OCRs its own pages one at a time
+    _parser = ResumeParser(None, mode=mode, ocr_workers=1)
+    _parser.load_nlp()
+
+
+def _parse_batch(batch, batch_size):
+    """Parse a batch of (name, bytes, content_hash) in an import worker process.
+
+    Text is extracted file by file, then every text goes through one batched
+    nlp.pipe pass. Returns the parsed resumes, the failures and the time
+    spent in each stage.
+    """
+    timings = Counter()
+    texts, parsed, failures = [], [], []
+
+    start = time.perf_counter()
+    for name, data, content_hash in batch:
+        text = _parser.extract_text(data, name)
+        if text:
+            texts.append(text)
+            parsed.append((name, content_hash))
+        else:
+            failures.append((name, 'Failed to extract text from file'))
+    timings['extract'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resumes = _parser.extract_information_batch(texts, batch_size=batch_size) if texts else []
+    timings['nlp'] = time.perf_counter() - start
+
+    return [(name, content_hash, resume) for (name, content_hash), resume in zip(parsed, resumes)], failures, timings
+
+
+def iter_resume_files(path, parser):
+    """Yield (name, bytes) for every PDF/DOCX in a directory, zip archive or tar archive."""
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for filename in sorted(files):
+                if parser.is_supported(filename):
+                    filepath = os.path.join(root, filename)
+                    with open(filepath, 'rb') as f:
+                        yield os.path.relpath(filepath, path), f.read()
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and parser.is_supported(info.filename):
+                    yield info.filename, archive.read(info)
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path) as archive:
+            for member in archive:
+                if member.isfile() and parser.is_supported(member.name):
+                    yield member.name, archive.extractfile(member).read()
+    else:
+        raise ValueError(f"{path} is not a directory, zip or tar archive")
+
+
+def bulk_import(path, db_manager, workers=None, batch_size=32, mode='fast', skip_duplicates=True):
+    """Parse every resume under ``path`` in a process pool and bulk insert the results.
+
+    Files whose content hash is already stored (or seen earlier in the run)
+    are skipped. At most two batches per worker are in flight, so memory
+    stays flat on large archives. A batch that fails, or is lost with a
+    crashed worker, is reported as failures and the import carries on.
+    """
+    workers = workers or os.cpu_count() or 1
+    parser = ResumeParser(db_manager, mode=mode)
+    stats = Counter()
+    timings = Counter()
+    failures = []
+    seen = set()
+
+    def read_batches():
+        batch = []
+        for name, data in iter_resume_files(path, parser):
+            batch.append((name, data, parser.content_hash(data)))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def new_resumes(batch):
+        if not skip_duplicates:
+            return batch
+        known = db_manager.get_known_content_hashes([content_hash for _, _, content_hash in batch])
+        unique = []
+        for name, data, content_hash in batch:
+            if content_hash in known or content_hash in seen:
+                stats['duplicates'] += 1
+            else:
+                seen.add(content_hash)
+                unique.append((name, data, content_hash))
+        return unique
+
+    def store(future):
+        names = pending.pop(future)
+        try:
+            parsed, batch_failures, batch_timings = future.result()
+        except Exception as e:
+            logger.error(f"Error parsing a batch of {len(names)} resumes: {str(e)}")
+            failures.extend((name, f"Batch failed: {str(e)}") for name in names)
+            return
+        timings.update(batch_timings)
+        failures.extend(batch_failures)
+        if parsed:
+            start = time.perf_counter()
+            db_manager.add_resumes([resume for _, _, resume in parsed],
+                                   content_hashes=[content_hash for _, content_hash, _ in parsed])
+            timings['store'] += time.perf_counter() - start
+            stats['imported'] += len(parsed)
+
+    def new_pool():
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(mode,))
+
+    start = time.perf_counter()
+    pending = {}  # future -> names of the files in its batch
+    pool = new_pool()
+    try:
+        batches = read_batches()
+        while True:
+            read_start = time.perf_counter()
+            batch = next(batches, None)
+            if batch is not None:
+                batch = new_resumes(batch)
+            timings['read'] += time.perf_counter() - read_start
+            if batch is None:
+                break
+            if not batch:
+                continue
+            if len(pending) >= workers * 2:
+                for future in wait(pending, return_when=FIRST_COMPLETED).done:
+                    store(future)
+            try:
+                future = pool.submit(_parse_batch, batch, batch_size)
+            except BrokenProcessPool:
+                # A worker died; its batches are already failed, so start over with a fresh pool
+                logger.error("Import worker pool broke, restarting it")
+                pool.shutdown(wait=False)
+                pool = new_pool()
+                future = pool.submit(_parse_batch, batch, batch_size)
+            pending[future] = [name for name, _, _ in batch]
+        for future in wait(pending).done:
+            store(future)
+    finally:
+        pool.shutdown()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'imported': stats['imported'],
+        'duplicates': stats['duplicates'],
+        'failures': failures,
+        'elapsed': elapsed,
+        'throughput': stats['imported'] / elapsed if elapsed else 0.0,
+        'timings': {stage: timings[stage] for stage in STAGES}
+    }
+
+
+@cli.callback()
+def main():
+    """Resume Matcher command-line tools."""
+
+
+@cli.command("import-resumes")
+def import_resumes(
+    path: str = typer.Argument(..., help="Directory, zip or tar archive of PDF/DOCX resumes"),
+    database: str = typer.Option(os.path.join('instance', 'resume_matcher.db'), help="Database path or URL"),
+    workers: int = typer.Option(0, help="Parser processes (0 = one per CPU)"),
+    batch_size: int = typer.Option(32, help="Resumes per worker batch and nlp.pipe batch"),
+    mode: str = typer.Option('fast', help="Parse mode: 'fast' or 'full'"),
+    skip_duplicates: bool = typer.Option(True, help="Skip files whose contents were already imported")
+):
+    """Bulk import resumes from a directory or archive."""
+    with DatabaseManager(database) as db_manager:
+        try:
+            report = bulk_import(path, db_manager, workers=workers or None, batch_size=batch_size,
+                                 mode=mode, skip_duplicates=skip_duplicates)
+        except ValueError as e:
+            typer.echo(f"Error: {str(e)}", err=True)
+            raise typer.Exit(code=2)
+
+    typer.echo(f"Imported {report['imported']} resumes in {report['elapsed']:.1f}s "
+               f"({report['throughput']:.1f} resumes/s)")
+    typer.echo(f"Skipped {report['duplicates']} duplicates, {len(report['failures'])} failed")
+    # extract and nlp are summed over the worker processes
+    for stage, seconds in report['timings'].items():
+        typer.echo(f"  {stage:<8} {seconds:8.2f}s")
+    for name, reason in report['failures']:
+        typer.echo(f"Failed: {name}: {reason}", err=True)
+    if report['failures']:
+        raise typer.Exit(code=1)
+
+
+@cli.command("match-all")
+def match_all(
+    database: str = typer.Option(os.path.join('instance', 'resume_matcher.db'), help="Database path or URL"),
+    index_path: str = typer.Option(None, help="Job index path (default: job_index.pkl next to the database)"),
+    k: int = typer.Option(10, help="Matches kept per resume and per job"),
+    resume_block_size: int = typer.Option(256, help="Resumes scored per tile"),
+    job_block_size: int = typer.Option(4096, help="Jobs scored per tile")
+):
+    """Score every resume against every job and store the top matches in both directions."""
+    index_path = index_path or os.path.join(os.path.dirname(database), 'job_index.pkl')
+    with DatabaseManager(database) as db_manager:
+        job_index = JobIndex.load(index_path)
+        engine = MatchingEngine(job_index=job_index, db_manager=db_manager)
+        start = time.perf_counter()
+        report = engine.match_all(k=k, resume_block_size=resume_block_size, job_block_size=job_block_size)
+        elapsed = time.perf_counter() - start
+        job_index.save()
+
+    pairs = report['resumes'] * report['jobs']
+    typer.echo(f"Scored {pairs} pairs ({report['resumes']} resumes x {report['jobs']} jobs) in {elapsed:.1f}s "
+               f"({pairs / elapsed if elapsed else 0:.0f} pairs/s), stored {report['stored']} top-{k} scores")
+
+
+@cli.command("rebuild-index")
+def rebuild_index(
+    database: str = typer.Option(os.path.join('instance', 'resume_matcher.db'), help="Database path or URL"),
+    index_path: str = typer.Option(None, help="Job index path (default: job_index.pkl next to the database)")
+):
+    """Refit the job index vocabulary and IDF over every stored job and drop the scores computed with the old fit.
+
+    Background refits after scrapes keep cached scores; this is the explicit
+    point at which every semantic score is recomputed.
+    """
+    index_path = index_path or os.path.join(os.path.dirname(database), 'job_index.pkl')
+    with DatabaseManager(database) as db_manager:
+        engine = MatchingEngine(job_index=JobIndex(index_path), db_manager=db_manager)
+        start = time.perf_counter()
+        job_index = engine.build_job_index(db_manager.get_all_jobs())
+        elapsed = time.perf_counter() - start
+        cleared = db_manager.clear_match_results()
+
+    vocabulary = len(job_index.vectorizer.vocabulary_) if job_index.is_built else 0
+    typer.echo(f"Indexed {len(job_index)} jobs ({vocabulary} terms) in {elapsed:.1f}s into {index_path}, "
+               f"cleared {cleared} cached scores")
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,12 +1,18 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, ForeignKey, DateTime
+from sqlalchemy import create_engine, event, inspect, text, bindparam, Column, Integer, String, Text, Float, ForeignKey, DateTime, Index, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, scoped_session, relationship
+from sqlalchemy.pool import QueuePool
 # import datetime
+import os
 import logging
+import re
 import uuid
-import sqlite3
+import hashlib
 from datetime import datetime
 import json
+import weakref
+from app.metrics import timed
+from app.job_requirements import extract_required_years
 
 Base = declarative_base()
 
@@ -15,6 +21,52 @@ logging.basicConfig(level=logging.ERROR,
                     handlers=[logging.StreamHandler()])
 logger = logging.getLogger(__name__)
 
+JOB_COLUMNS = ['id', 'title', 'company', 'location', 'description', 'skills', 'salary', 'url', 'created_at', 'updated_at',
+               'required_years']
+# Columns whose values decide whether an incoming job differs from the stored one
+JOB_CONTENT_COLUMNS = ['title', 'company', 'location', 'description', 'skills', 'salary', 'url', 'created_at',
+                       'required_years']
+MATCH_RESULT_COLUMNS = ['id', 'resume_id', 'job_id', 'total_score', 'keyword_score', 'semantic_score',
+                        'experience_score', 'config_version', 'created_at']
+# Columns of the jobs_fts full-text index, with their BM25 weights
+JOB_SEARCH_COLUMNS = {'title': 4.0, 'company': 2.0, 'location': 1.0, 'description': 1.0}
+
+# Engines created in this process, whose pooled connections a forked child must not reuse
+_engines = weakref.WeakSet()
+
+
+def _dispose_engines_in_child():
+    for engine in list(_engines):
+        # close=False drops the inherited connections from the child's pool without closing the parent's
+        engine.dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_engines_in_child)
+
+
+def dispose_after_fork(engine):
+    """Have a forked child (e.g. a ``gunicorn --preload`` worker) open its own connections to ``engine``."""
+    _engines.add(engine)
+    return engine
+# Jobs sharing at least :min_shared skills with :resume_id, via the skill inverted index
+CANDIDATE_JOBS_QUERY = '''
+SELECT job_skills.job_id FROM resume_skills
+JOIN job_skills ON job_skills.skill_id = resume_skills.skill_id
+WHERE resume_skills.resume_id = :resume_id
+GROUP BY job_skills.job_id
+HAVING COUNT(*) >= :min_shared
+'''
+UPLOAD_TASK_COLUMNS = ['id', 'filepath', 'filename', 'resume_id', 'status', 'progress', 'error',
+                       'created_at', 'updated_at']
+
+
+def _skill_names(skills):
+    # Jobs store skills comma-joined, resumes as a list; index them lowercased and de-duplicated
+    if isinstance(skills, str):
+        skills = skills.split(',')
+    return list(dict.fromkeys(skill.strip().lower() for skill in skills or [] if skill and skill.strip()))
+
 
 class Resume(Base):
     __tablename__ = 'resumes'
@@ -27,6 +79,7 @@ class Resume(Base):
     experience = Column(Text)
     education = Column(Text)
     created_at = Column(String(50))
+    content_hash = Column(String(64), index=True)
 
     def __init__(self, **kwargs):
         super(Resume, self).__init__(**kwargs)
@@ -34,8 +87,8 @@ class Resume(Base):
             self.id = str(uuid.uuid4())
         if 'created_at' not in kwargs:
             # Convert datetime to ISO format string before saving
-            self.created_at = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-        elif isinstance(kwargs['created_at'], datetime.datetime):
+            self.created_at = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        elif isinstance(kwargs['created_at'], datetime):
             # Convert datetime to ISO format string if passed as a datetime
             self.created_at = kwargs['created_at'].strftime('%Y-%m-%d %H:%M:%S')
         else:
@@ -55,6 +108,9 @@ class Job(Base):
     salary = Column(String(50))
     url = Column(String(200))
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    content_hash = Column(String(64))
+    required_years = Column(Float)  # years of experience asked for, extracted at ingest
 
 class MatchResult(Base):
     __tablename__ = 'match_results'
@@ -66,104 +122,447 @@ class MatchResult(Base):
     keyword_score = Column(Float)
     semantic_score = Column(Float)
     experience_score = Column(Float)
+    config_version = Column(String(50))
     created_at = Column(DateTime, default=datetime.utcnow)
 
     resume = relationship("Resume")
     job = relationship("Job")
 
+    __table_args__ = (
+        Index('idx_match_results_key', 'resume_id', 'job_id', 'config_version', unique=True),
+        Index('idx_match_results_job_id', 'job_id'),
+    )
+
+
+class Skill(Base):
+    __tablename__ = 'skills'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), unique=True, nullable=False)
+
+
+class JobSkill(Base):
+    """Posting list entry of the skill inverted index: a job that asks for a skill."""
+    __tablename__ = 'job_skills'
+
+    skill_id = Column(Integer, ForeignKey('skills.id'), primary_key=True)
+    job_id = Column(String(50), ForeignKey('jobs.id'), primary_key=True, index=True)
+
+
+class ResumeSkill(Base):
+    """Posting list entry of the skill inverted index: a resume that lists a skill."""
+    __tablename__ = 'resume_skills'
+
+    skill_id = Column(Integer, ForeignKey('skills.id'), primary_key=True)
+    resume_id = Column(String(50), ForeignKey('resumes.id'), primary_key=True, index=True)
+
+
+class SearchRefresh(Base):
+    """When a job search was last refreshed from the live scraper."""
+    __tablename__ = 'search_refreshes'
+
+    query_key = Column(String(300), primary_key=True)
+    refreshed_at = Column(String(50))
+
+
+class UploadTask(Base):
+    __tablename__ = 'upload_tasks'
+
+    id = Column(String(50), primary_key=True, default=lambda: str(uuid.uuid4()))
+    filepath = Column(String(500))
+    filename = Column(String(200))
+    payload = Column(LargeBinary)  # uploaded bytes, dropped once the task finishes
+    resume_id = Column(String(50))
+    status = Column(String(20), index=True)
+    progress = Column(Integer, default=0)
+    error = Column(Text)
+    created_at = Column(String(50))
+    updated_at = Column(String(50))
+
 
 class DatabaseManager:
-    def __init__(self, db_path='resume_matcher.db'):
+    """Data access over a single pooled SQLAlchemy engine.
+
+    Each thread gets its own session (and so its own pooled connection) through
+    a scoped_session; connections are opened once, switched to WAL and tuned
+    with pragmas, then reused until close().
+    """
+
+    def __init__(self, db_path='resume_matcher.db', pool_size=5, max_overflow=10,
+                 mmap_size=256 * 1024 * 1024, cache_size=-64000):
         self.db_path = db_path
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size  # negative values are KiB
+        self.job_listeners = []
+
+        url = db_path if '://' in db_path else f"sqlite:///{db_path}"
+        self.engine = create_engine(
+            url,
+            poolclass=QueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            connect_args={'check_same_thread': False, 'timeout': 30}
+        )
+        dispose_after_fork(self.engine)
+        event.listen(self.engine, 'connect', self._configure_connection)
+        self.Session = scoped_session(sessionmaker(bind=self.engine))
         self.create_tables()
 
+    def _configure_connection(self, dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers proceed while a writer holds the lock
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(self.cache_size)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    def close(self):
+        self.Session.remove()
+        self.engine.dispose()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def create_tables(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS resumes (
-            id TEXT PRIMARY KEY,
-            name TEXT,
-            email TEXT,
-            phone TEXT,
-            skills TEXT,
-            experience TEXT,
-            education TEXT,
-            created_at TEXT
-        )
-        ''')
-        conn.commit()
-        conn.close()
-
-    def add_resume(self, resume_data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        try:
-            resume_id = str(uuid.uuid4())
-            created_at = datetime.utcnow().isoformat()
-
-            # Ensure all data is in string format
-            name = str(resume_data.get('name', ''))
-            email = str(resume_data.get('email', ''))
-            phone = str(resume_data.get('phone', ''))
-            skills = json.dumps(resume_data.get('skills', []))  # Convert list to JSON string
-            experience = str(resume_data.get('experience', ''))
-            education = str(resume_data.get('education', ''))
-
-            cursor.execute('''
-            INSERT INTO resumes (id, name, email, phone, skills, experience, education, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                resume_id,
-                name,
-                email,
-                phone,
-                skills,
-                experience,
-                education,
-                created_at
+        had_skill_index = inspect(self.engine).has_table('skills')
+        Base.metadata.create_all(self.engine)
+        with self.engine.begin() as connection:
+            # Databases created before these columns existed
+            self._add_missing_columns(connection, 'resumes', {'content_hash': 'TEXT'})
+            added = self._add_missing_columns(connection, 'jobs', {'updated_at': 'TEXT', 'content_hash': 'TEXT',
+                                                                   'required_years': 'REAL'})
+            if 'required_years' in added:
+                self._backfill_required_years(connection)
+            self._add_missing_columns(connection, 'match_results', {'config_version': 'TEXT'})
+            self._add_missing_columns(connection, 'upload_tasks', {'payload': 'BLOB'})
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(connection, checkfirst=True)
+        if not had_skill_index:
+            self.rebuild_skill_index()
+        if self.engine.dialect.name == 'sqlite':
+            self._create_job_search_index()
+
+    def _create_job_search_index(self):
+        """FTS5 index over the job text columns, kept in sync with jobs by triggers."""
+        columns = ', '.join(JOB_SEARCH_COLUMNS)
+        new_values = ', '.join(f'new.{column}' for column in JOB_SEARCH_COLUMNS)
+        old_values = ', '.join(f'old.{column}' for column in JOB_SEARCH_COLUMNS)
+        with self.engine.begin() as connection:
+            exists = inspect(connection).has_table('jobs_fts')
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5({columns}, content='jobs', content_rowid='rowid')"
             ))
-            conn.commit()
-            return resume_id
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"Error adding resume: {str(e)}")
-            logger.error(f"Resume data: {resume_data}")
-            raise
-        finally:
-            conn.close()
+            connection.execute(text(f'''
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+                INSERT INTO jobs_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+            END
+            '''))
+            connection.execute(text(f'''
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+                INSERT INTO jobs_fts (jobs_fts, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+            END
+            '''))
+            connection.execute(text(f'''
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE ON jobs BEGIN
+                INSERT INTO jobs_fts (jobs_fts, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+                INSERT INTO jobs_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+            END
+            '''))
+            if not exists:
+                # Index the jobs stored before the search index existed
+                connection.execute(text("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')"))
+
+    def _add_missing_columns(self, connection, table, columns):
+        existing = {column['name'] for column in inspect(connection).get_columns(table)}
+        added = []
+        for column, column_type in columns.items():
+            if column not in existing:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+                added.append(column)
+        return added
+
+    def _backfill_required_years(self, connection, chunk_size=500):
+        # Jobs stored before required_years existed would otherwise score as needing no experience
+        rows = connection.execute(text("SELECT id, description FROM jobs")).fetchall()
+        updates = [{'id': row.id, 'required_years': extract_required_years(row.description)} for row in rows]
+        for start in range(0, len(updates), chunk_size):
+            connection.execute(text("UPDATE jobs SET required_years = :required_years WHERE id = :id"),
+                               updates[start:start + chunk_size])
+        if updates:
+            logger.info(f"Backfilled required_years for {len(updates)} jobs")
+
+    def _replace_skill_postings(self, session, table, key, postings, chunk_size=500):
+        """Replace the skill postings of every id in ``postings`` ({id: skills}) within ``session``."""
+        if not postings:
+            return
+        session.execute(text(f"DELETE FROM {table} WHERE {key} = :id"), [{'id': item_id} for item_id in postings])
+        postings = {item_id: _skill_names(skills) for item_id, skills in postings.items()}
+        names = list({name for skills in postings.values() for name in skills})
+        if not names:
+            return
+        session.execute(text("INSERT INTO skills (name) VALUES (:name) ON CONFLICT (name) DO NOTHING"),
+                        [{'name': name} for name in names])
+        skill_ids = {}
+        query = text("SELECT name, id FROM skills WHERE name IN :names").bindparams(bindparam('names', expanding=True))
+        for start in range(0, len(names), chunk_size):
+            skill_ids.update(session.execute(query, {'names': names[start:start + chunk_size]}).all())
+        session.execute(text(f"INSERT INTO {table} (skill_id, {key}) VALUES (:skill_id, :id)"), [
+            {'skill_id': skill_ids[name], 'id': item_id} for item_id, skills in postings.items() for name in skills
+        ])
+
+    def rebuild_skill_index(self):
+        """Fill the skill inverted index from the stored jobs and resumes (databases created before it existed)."""
+        for table, key, chunks in (('job_skills', 'job_id', self.iter_jobs()),
+                                   ('resume_skills', 'resume_id', self.iter_resumes())):
+            for chunk in chunks:
+                with self.Session() as session:
+                    self._replace_skill_postings(session, table, key, {row['id']: row['skills'] for row in chunk})
+                    session.commit()
+
+    @timed('database', 'get_candidate_job_ids')
+    def get_candidate_job_ids(self, resume_id, min_shared=1):
+        """Ids of jobs sharing at least ``min_shared`` skills with a resume, via the skill inverted index."""
+        with self.Session() as session:
+            return list(session.execute(
+                text(CANDIDATE_JOBS_QUERY), {'resume_id': resume_id, 'min_shared': min_shared}
+            ).scalars())
+
+    def get_candidate_resume_ids(self, job_id, min_shared=1):
+        """Ids of resumes sharing at least ``min_shared`` skills with a job, via the skill inverted index."""
+        with self.Session() as session:
+            return list(session.execute(text('''
+            SELECT resume_skills.resume_id FROM job_skills
+            JOIN resume_skills ON resume_skills.skill_id = job_skills.skill_id
+            WHERE job_skills.job_id = :job_id
+            GROUP BY resume_skills.resume_id
+            HAVING COUNT(*) >= :min_shared
+            '''), {'job_id': job_id, 'min_shared': min_shared}).scalars())
+
+    def add_resume(self, resume_data, content_hash=None):
+        return self.add_resumes([resume_data], content_hashes=[content_hash])[0]
+
+    def _resume_row(self, resume_data, content_hash, created_at):
+        # Ensure all data is in string format
+        return {
+            'id': str(uuid.uuid4()),
+            'name': str(resume_data.get('name', '')),
+            'email': str(resume_data.get('email', '')),
+            'phone': str(resume_data.get('phone', '')),
+            'skills': json.dumps(resume_data.get('skills', [])),  # Convert list to JSON string
+            'experience': str(resume_data.get('experience', '')),
+            'education': str(resume_data.get('education', '')),
+            'created_at': created_at,
+            'content_hash': content_hash
+        }
+
+    @timed('database', 'add_resumes')
+    def add_resumes(self, resumes, content_hashes=None, chunk_size=500):
+        """Insert many parsed resumes with one executemany per chunk; returns their new ids in order."""
+        created_at = datetime.utcnow().isoformat()
+        content_hashes = content_hashes or [None] * len(resumes)
+        rows = [self._resume_row(resume_data, content_hash, created_at)
+                for resume_data, content_hash in zip(resumes, content_hashes)]
+        with self.Session() as session:
+            try:
+                for start in range(0, len(rows), chunk_size):
+                    session.execute(text('''
+                    INSERT INTO resumes (id, name, email, phone, skills, experience, education, created_at, content_hash)
+                    VALUES (:id, :name, :email, :phone, :skills, :experience, :education, :created_at, :content_hash)
+                    '''), rows[start:start + chunk_size])
+                self._replace_skill_postings(session, 'resume_skills', 'resume_id', {
+                    row['id']: resume_data.get('skills', []) for row, resume_data in zip(rows, resumes)
+                })
+                session.commit()
+                return [row['id'] for row in rows]
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error adding resumes: {str(e)}")
+                logger.error(f"Resume data: {resumes[:5]}")
+                raise
+
+    @timed('database', 'update_resume')
+    def update_resume(self, resume_id, resume_data, content_hash=None):
+        """Replace the parsed contents of an existing resume and drop its cached match scores."""
+        with self.Session() as session:
+            try:
+                result = session.execute(text('''
+                UPDATE resumes SET name = :name, email = :email, phone = :phone, skills = :skills,
+                    experience = :experience, education = :education, content_hash = :content_hash
+                WHERE id = :id
+                '''), {
+                    'id': resume_id,
+                    'name': str(resume_data.get('name', '')),
+                    'email': str(resume_data.get('email', '')),
+                    'phone': str(resume_data.get('phone', '')),
+                    'skills': json.dumps(resume_data.get('skills', [])),
+                    'experience': str(resume_data.get('experience', '')),
+                    'education': str(resume_data.get('education', '')),
+                    'content_hash': content_hash
+                })
+                if result.rowcount == 0:
+                    session.rollback()
+                    return None
+                session.execute(text("DELETE FROM match_results WHERE resume_id = :resume_id"),
+                                {'resume_id': resume_id})
+                self._replace_skill_postings(session, 'resume_skills', 'resume_id',
+                                             {resume_id: resume_data.get('skills', [])})
+                session.commit()
+                return resume_id
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error updating resume {resume_id}: {str(e)}")
+                raise
 
     def get_resume(self, resume_id):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT * FROM resumes WHERE id = ?", (resume_id,))
-            result = cursor.fetchone()
+        with self.Session() as session:
+            result = session.execute(
+                text("SELECT id, name, email, phone, skills, experience, education, created_at "
+                     "FROM resumes WHERE id = :id"),
+                {'id': resume_id}
+            ).mappings().first()
             if result:
-                resume_dict = dict(zip(['id', 'name', 'email', 'phone', 'skills', 'experience', 'education', 'created_at'], result))
+                resume_dict = dict(result)
                 resume_dict['skills'] = json.loads(resume_dict['skills'])  # Convert JSON string back to list
                 return resume_dict
             return None
-        finally:
-            conn.close()
+
+    def get_resume_by_hash(self, content_hash):
+        """The most recent resume parsed from a file with this content hash, or None."""
+        with self.Session() as session:
+            resume_id = session.execute(
+                text("SELECT id FROM resumes WHERE content_hash = :content_hash ORDER BY created_at DESC LIMIT 1"),
+                {'content_hash': content_hash}
+            ).scalar()
+        return self.get_resume(resume_id) if resume_id else None
+
+    def iter_resumes(self, chunk_size=500):
+        """Yield every resume in lists of up to ``chunk_size``, paging by id so memory stays flat."""
+        last_id = ''
+        while True:
+            with self.Session() as session:
+                rows = session.execute(
+                    text("SELECT id, name, email, phone, skills, experience, education, created_at "
+                         "FROM resumes WHERE id > :last_id ORDER BY id LIMIT :limit"),
+                    {'last_id': last_id, 'limit': chunk_size}
+                ).mappings().all()
+            if not rows:
+                return
+            resumes = [dict(row, skills=json.loads(row['skills'] or '[]')) for row in rows]
+            last_id = resumes[-1]['id']
+            yield resumes
+
+    def get_known_content_hashes(self, content_hashes):
+        """The subset of ``content_hashes`` that already belong to a stored resume."""
+        if not content_hashes:
+            return set()
+        query = text("SELECT content_hash FROM resumes WHERE content_hash IN :content_hashes").bindparams(
+            bindparam('content_hashes', expanding=True)
+        )
+        with self.Session() as session:
+            return set(session.execute(query, {'content_hashes': list(content_hashes)}).scalars())
+
+    def add_job_listener(self, listener):
+        """Register a callable invoked with the list of jobs inserted or changed by add_job/add_jobs."""
+        self.job_listeners.append(listener)
+
+    def _notify_job_listeners(self, jobs):
+        for listener in self.job_listeners:
+            try:
+                listener(jobs)
+            except Exception as e:
+                logger.error(f"Error in job listener {listener}: {str(e)}")
 
     def add_job(self, job_data):
+        self.add_jobs([job_data])
+        return job_data['id']
+
+    def _job_row(self, job_data):
+        row = {column: job_data.get(column) for column in JOB_COLUMNS}
+        if 'required_years' not in job_data:
+            # Derived here so every ingest path stores it, not only the scraper
+            row['required_years'] = extract_required_years(row['description'])
+        if isinstance(row['created_at'], datetime):
+            row['created_at'] = row['created_at'].isoformat()
+        content = json.dumps([row[column] for column in JOB_CONTENT_COLUMNS], default=str)
+        row['content_hash'] = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        return row
+
+    @timed('database', 'add_jobs')
+    def add_jobs(self, jobs, chunk_size=500):
+        """Upsert a batch of jobs in one transaction.
+
+        Jobs whose content hash matches the stored row are skipped. Returns the
+        number of inserted, updated and unchanged jobs.
+        """
+        rows = {}
+        for job_data in jobs:
+            rows[job_data['id']] = self._job_row(job_data)  # last occurrence of an id wins
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        if not rows:
+            return counts
+
+        existing_query = text(
+            "SELECT id, content_hash, description, skills, required_years FROM jobs WHERE id IN :job_ids"
+        ).bindparams(bindparam('job_ids', expanding=True))
+        columns = JOB_COLUMNS + ['content_hash']
+        upsert = text(f'''
+        INSERT INTO jobs ({', '.join(columns)})
+        VALUES ({', '.join(f':{column}' for column in columns)})
+        ON CONFLICT (id) DO UPDATE SET
+            {', '.join(f'{column} = excluded.{column}' for column in columns[1:])}
+        WHERE jobs.content_hash IS NOT excluded.content_hash
+        ''')
+
+        changed = []
         with self.Session() as session:
             try:
-                existing_job = session.query(Job).filter_by(id=job_data['id']).first()
-                if existing_job:
-                    for key, value in job_data.items():
-                        setattr(existing_job, key, value)
-                else:
-                    job = Job(**job_data)
-                    session.add(job)
+                job_ids = list(rows)
+                existing = {}
+                for i in range(0, len(job_ids), chunk_size):
+                    result = session.execute(existing_query, {'job_ids': job_ids[i:i + chunk_size]})
+                    existing.update((row.id, row) for row in result)
+
+                updated_at = datetime.utcnow().isoformat()
+                stale_scores = []
+                for job_id, row in rows.items():
+                    stored = existing.get(job_id)
+                    if stored is None:
+                        counts['inserted'] += 1
+                    elif stored.content_hash == row['content_hash']:
+                        counts['unchanged'] += 1
+                        continue
+                    else:
+                        counts['updated'] += 1
+                        # Cached scores only depend on the description, skills and required years of a job
+                        if ((stored.description, stored.skills, stored.required_years)
+                                != (row['description'], row['skills'], row['required_years'])):
+                            stale_scores.append({'job_id': job_id})
+                    row['updated_at'] = updated_at
+                    changed.append(row)
+
+                if changed:
+                    session.execute(upsert, changed)
+                    self._replace_skill_postings(session, 'job_skills', 'job_id',
+                                                 {row['id']: row['skills'] for row in changed})
+                if stale_scores:
+                    session.execute(text("DELETE FROM match_results WHERE job_id = :job_id"), stale_scores)
                 session.commit()
-                return job_data['id']
             except Exception as e:
                 session.rollback()
-                logger.error(f"Error adding/updating job: {str(e)}")
+                logger.error(f"Error upserting jobs: {str(e)}")
                 raise
 
+        if changed:
+            self._notify_job_listeners(changed)
+        logger.info(f"Upserted jobs: {counts}")
+        return counts
+
     def add_match_result(self, match_data):
         with self.Session() as session:
             try:
@@ -179,40 +578,296 @@ class DatabaseManager:
                 logger.error(f"Error adding match result: {str(e)}")
                 raise
 
-    # def get_resume(self, resume_id):
-    #     with self.Session() as session:
-    #         resume = session.query(Resume).filter(Resume.id == resume_id).first()
-    #         if resume is None:
-    #             logger.warning(f"No resume found with id: {resume_id}")
-    #         return resume
-
     def get_job(self, job_id):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
-            result = cursor.fetchone()
+        with self.Session() as session:
+            result = session.execute(
+                text(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = :id"), {'id': job_id}
+            ).mappings().first()
             if result:
-                return dict(zip(['id', 'title', 'company', 'location', 'description', 'skills', 'salary', 'url', 'created_at'], result))
+                return dict(result)
             logger.warning(f"No job found with id: {job_id}")
             return None
-        finally:
-            conn.close()
-
-    def get_match_results(self, resume_id=None, job_id=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        try:
-            query = "SELECT * FROM match_results WHERE 1=1"
-            params = []
-            if resume_id:
-                query += " AND resume_id = ?"
-                params.append(resume_id)
-            if job_id:
-                query += " AND job_id = ?"
-                params.append(job_id)
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-            return [dict(zip(['id', 'resume_id', 'job_id', 'total_score', 'keyword_score', 'semantic_score', 'experience_score', 'created_at'], row)) for row in results]
-        finally:
-            conn.close()
\ No newline at end of file
+
+    @timed('database', 'get_jobs')
+    def get_jobs(self, job_ids):
+        job_ids = list(job_ids)
+        if not job_ids:
+            return []
+        query = text(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id IN :job_ids").bindparams(
+            bindparam('job_ids', expanding=True)
+        )
+        with self.Session() as session:
+            return [dict(row) for row in session.execute(query, {'job_ids': job_ids}).mappings()]
+
+    def get_all_jobs(self):
+        with self.Session() as session:
+            rows = session.execute(text(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs ORDER BY id")).mappings()
+            return [dict(row) for row in rows]
+
+    def iter_jobs(self, chunk_size=500):
+        """Yield every job in lists of up to ``chunk_size``, paging by id so memory stays flat."""
+        last_id = ''
+        while True:
+            with self.Session() as session:
+                rows = session.execute(
+                    text(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id > :last_id ORDER BY id LIMIT :limit"),
+                    {'last_id': last_id, 'limit': chunk_size}
+                ).mappings().all()
+            if not rows:
+                return
+            last_id = rows[-1]['id']
+            yield [dict(row) for row in rows]
+
+    @timed('database', 'search_jobs')
+    def search_jobs(self, query, location=None, limit=10, cursor=None):
+        """BM25-ranked full-text search over the stored jobs.
+
+        Every word of ``query`` must match; ``location`` restricts matches to
+        the location column. Pages are keyset-paginated: pass the returned
+        ``next_cursor`` to get the following page. Returns (jobs, next_cursor).
+        """
+        terms = [f'"{word}"' for word in re.findall(r'\w+', query or '')]
+        location_terms = [f'"{word}"' for word in re.findall(r'\w+', location or '')]
+        if location_terms:
+            terms.append(f"location : ({' '.join(location_terms)})")
+        if not terms:
+            return [], None
+
+        weights = ', '.join(str(weight) for weight in JOB_SEARCH_COLUMNS.values())
+        query_sql = f'''
+        SELECT * FROM (
+            SELECT {', '.join(f'jobs.{column}' for column in JOB_COLUMNS)},
+                jobs_fts.rowid AS fts_rowid, bm25(jobs_fts, {weights}) AS score
+            FROM jobs_fts JOIN jobs ON jobs.rowid = jobs_fts.rowid
+            WHERE jobs_fts MATCH :match
+        )
+        '''
+        params = {'match': ' AND '.join(terms), 'limit': limit}
+        if cursor:
+            score, rowid = cursor.split(':')
+            query_sql += " WHERE (score, fts_rowid) > (:score, :rowid)"
+            params.update(score=float(score), rowid=int(rowid))
+        query_sql += " ORDER BY score, fts_rowid LIMIT :limit"
+
+        with self.Session() as session:
+            rows = [dict(row) for row in session.execute(text(query_sql), params).mappings()]
+        next_cursor = f"{rows[-1]['score']!r}:{rows[-1]['fts_rowid']}" if len(rows) == limit else None
+        jobs = [{column: row[column] for column in JOB_COLUMNS} for row in rows]
+        return jobs, next_cursor
+
+    def get_search_refreshed_at(self, query_key):
+        with self.Session() as session:
+            return session.execute(
+                text("SELECT refreshed_at FROM search_refreshes WHERE query_key = :query_key"),
+                {'query_key': query_key}
+            ).scalar()
+
+    def mark_search_refreshed(self, query_key):
+        with self.Session() as session:
+            session.execute(text('''
+            INSERT INTO search_refreshes (query_key, refreshed_at) VALUES (:query_key, :refreshed_at)
+            ON CONFLICT (query_key) DO UPDATE SET refreshed_at = excluded.refreshed_at
+            '''), {'query_key': query_key, 'refreshed_at': datetime.utcnow().isoformat()})
+            session.commit()
+
+    def get_job_ids(self):
+        with self.Session() as session:
+            return list(session.execute(text("SELECT id FROM jobs ORDER BY id")).scalars())
+
+    def get_match_results(self, resume_id=None, job_id=None, config_version=None):
+        query = f"SELECT {', '.join(MATCH_RESULT_COLUMNS)} FROM match_results WHERE 1=1"
+        params = {}
+        if resume_id:
+            query += " AND resume_id = :resume_id"
+            params['resume_id'] = resume_id
+        if job_id:
+            query += " AND job_id = :job_id"
+            params['job_id'] = job_id
+        if config_version:
+            query += " AND config_version = :config_version"
+            params['config_version'] = config_version
+        with self.Session() as session:
+            return [dict(row) for row in session.execute(text(query), params).mappings()]
+
+    def _upsert_match_results(self, session, config_version, match_results):
+        created_at = datetime.utcnow().isoformat()
+        session.execute(text(f'''
+        INSERT INTO match_results ({', '.join(MATCH_RESULT_COLUMNS)})
+        VALUES ({', '.join(f':{column}' for column in MATCH_RESULT_COLUMNS)})
+        ON CONFLICT (resume_id, job_id, config_version) DO UPDATE SET
+            total_score = excluded.total_score,
+            keyword_score = excluded.keyword_score,
+            semantic_score = excluded.semantic_score,
+            experience_score = excluded.experience_score,
+            created_at = excluded.created_at
+        '''), [{
+            'id': str(uuid.uuid4()),
+            'resume_id': match['resume_id'],
+            'job_id': match['job_id'],
+            'total_score': match['total_score'],
+            'keyword_score': match['keyword_score'],
+            'semantic_score': match['semantic_score'],
+            'experience_score': match['experience_score'],
+            'config_version': config_version,
+            'created_at': created_at
+        } for match in match_results])
+
+    @timed('database', 'save_match_results')
+    def save_match_results(self, resume_id, config_version, match_results):
+        """Upsert scores for (resume_id, job_id, config_version), dropping rows scored under other versions."""
+        with self.Session() as session:
+            try:
+                session.execute(
+                    text("DELETE FROM match_results WHERE resume_id = :resume_id AND config_version IS NOT :config_version"),
+                    {'resume_id': resume_id, 'config_version': config_version}
+                )
+                self._upsert_match_results(
+                    session, config_version, [dict(match, resume_id=resume_id) for match in match_results]
+                )
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error saving match results: {str(e)}")
+                raise
+
+    @timed('database', 'save_match_results_bulk')
+    def save_match_results_bulk(self, config_version, match_results, chunk_size=5000):
+        """Upsert scores for many resumes at once; each match carries its own resume_id."""
+        with self.Session() as session:
+            try:
+                for start in range(0, len(match_results), chunk_size):
+                    self._upsert_match_results(session, config_version, match_results[start:start + chunk_size])
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error saving match results: {str(e)}")
+                raise
+
+    def delete_stale_match_results(self, config_version):
+        """Drop every score computed under a scoring version other than ``config_version``."""
+        with self.Session() as session:
+            result = session.execute(
+                text("DELETE FROM match_results WHERE config_version IS NOT :config_version"),
+                {'config_version': config_version}
+            )
+            session.commit()
+            return result.rowcount
+
+    def clear_match_results(self):
+        """Drop every stored score, so all of them are recomputed on demand."""
+        with self.Session() as session:
+            result = session.execute(text("DELETE FROM match_results"))
+            session.commit()
+            return result.rowcount
+
+    @timed('database', 'get_unscored_job_ids')
+    def get_unscored_job_ids(self, resume_id, config_version, min_shared=0):
+        """Ids of candidate jobs without a stored score for a resume under ``config_version``.
+
+        Candidates are every job, or with ``min_shared`` the jobs sharing that
+        many skills with the resume.
+        """
+        candidates = CANDIDATE_JOBS_QUERY if min_shared else "SELECT id AS job_id FROM jobs"
+        query = f'''
+        SELECT candidates.job_id FROM ({candidates}) AS candidates
+        WHERE NOT EXISTS (
+            SELECT 1 FROM match_results
+            WHERE match_results.resume_id = :resume_id
+              AND match_results.job_id = candidates.job_id
+              AND match_results.config_version = :config_version
+        )
+        '''
+        with self.Session() as session:
+            return list(session.execute(text(query), {
+                'resume_id': resume_id, 'config_version': config_version, 'min_shared': min_shared
+            }).scalars())
+
+    @timed('database', 'get_top_match_results')
+    def get_top_match_results(self, config_version, resume_id=None, job_id=None, limit=10, min_shared=0):
+        """Best scored rows for a resume or a job under one scoring version, highest total first.
+
+        With ``resume_id`` and ``min_shared``, only jobs sharing that many
+        skills with the resume are considered.
+        """
+        query = f"SELECT {', '.join(MATCH_RESULT_COLUMNS)} FROM match_results WHERE config_version = :config_version"
+        params = {'config_version': config_version, 'limit': limit}
+        if resume_id:
+            query += " AND resume_id = :resume_id"
+            params['resume_id'] = resume_id
+            if min_shared:
+                query += f" AND job_id IN ({CANDIDATE_JOBS_QUERY})"
+                params['min_shared'] = min_shared
+        if job_id:
+            query += " AND job_id = :job_id"
+            params['job_id'] = job_id
+        query += " ORDER BY total_score DESC, job_id, resume_id LIMIT :limit"
+        with self.Session() as session:
+            return [dict(row) for row in session.execute(text(query), params).mappings()]
+
+    def add_upload_task(self, filename, payload=None, filepath=None, resume_id=None):
+        """Queue a resume given either its uploaded bytes or a path on disk."""
+        task_id = str(uuid.uuid4())
+        now = datetime.utcnow().isoformat()
+        columns = UPLOAD_TASK_COLUMNS + ['payload']
+        with self.Session() as session:
+            session.execute(text(f'''
+            INSERT INTO upload_tasks ({', '.join(columns)})
+            VALUES ({', '.join(f':{column}' for column in columns)})
+            '''), {
+                'id': task_id,
+                'payload': payload,
+                'filepath': filepath,
+                'filename': filename,
+                'resume_id': resume_id,
+                'status': 'queued',
+                'progress': 0,
+                'error': None,
+                'created_at': now,
+                'updated_at': now
+            })
+            session.commit()
+        return task_id
+
+    def get_upload_task(self, task_id):
+        with self.Session() as session:
+            result = session.execute(
+                text(f"SELECT {', '.join(UPLOAD_TASK_COLUMNS)} FROM upload_tasks WHERE id = :id"), {'id': task_id}
+            ).mappings().first()
+            return dict(result) if result else None
+
+    def get_upload_payload(self, task_id):
+        with self.Session() as session:
+            return session.execute(
+                text("SELECT payload FROM upload_tasks WHERE id = :id"), {'id': task_id}
+            ).scalar()
+
+    def update_upload_task(self, task_id, **fields):
+        fields['updated_at'] = datetime.utcnow().isoformat()
+        with self.Session() as session:
+            session.execute(
+                text(f"UPDATE upload_tasks SET {', '.join(f'{key} = :{key}' for key in fields)} WHERE id = :id"),
+                dict(fields, id=task_id)
+            )
+            session.commit()
+
+    def claim_upload_task(self, task_id):
+        """Atomically move a queued task to running; False if another worker already has it."""
+        with self.Session() as session:
+            result = session.execute(text('''
+            UPDATE upload_tasks SET status = 'running', progress = 10, updated_at = :updated_at
+            WHERE id = :id AND status = 'queued'
+            '''), {'id': task_id, 'updated_at': datetime.utcnow().isoformat()})
+            session.commit()
+            return result.rowcount == 1
+
+    def requeue_upload_tasks(self, stale_before):
+        """Return queued task ids, first requeueing running tasks not updated since ``stale_before``."""
+        with self.Session() as session:
+            session.execute(text('''
+            UPDATE upload_tasks SET status = 'queued', progress = 0
+            WHERE status = 'running' AND updated_at < :stale_before
+            '''), {'stale_before': stale_before})
+            session.commit()
+            return list(session.execute(
+                text("SELECT id FROM upload_tasks WHERE status = 'queued' ORDER BY created_at")
+            ).scalars())
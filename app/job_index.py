@@ -0,0 +1,296 @@
+import os
+import pickle
+import logging
+import threading
+import uuid
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+logger = logging.getLogger(__name__)
+
+
+class JobIndex:
+    """TF-IDF index over the stored job descriptions.
+
+    Rows are L2-normalised, so a single sparse matrix-vector product against a
+    transformed resume gives the cosine similarity to every indexed job.
+
+    New or updated jobs are appended with the already fitted vocabulary; the
+    row of a replaced job is tombstoned. A background compaction drops the
+    tombstones and refits the vocabulary and IDF over the live documents once
+    tombstones exceed ``compaction_threshold`` of the rows, once appended rows
+    with terms unseen by the fit exceed ``refit_threshold`` of the fitted rows,
+    or once the corpus has doubled since the fit.
+    """
+
+    def __init__(self, path=None, compaction_threshold=0.2, maintenance_delay=5.0, refit_threshold=0.05):
+        self.path = path
+        self.compaction_threshold = compaction_threshold
+        self.refit_threshold = refit_threshold
+        self.maintenance_delay = maintenance_delay
+        self.vectorizer = None
+        self.build_id = None
+        self.matrix = None
+        self.job_ids = []
+        self.documents = []  # preprocessed text of every row, kept so the index can be refitted (None if not kept)
+        self.positions = {}
+        self.tombstones = set()
+        self.fitted_rows = 0
+        self.appended_rows = 0
+        self.unseen_term_rows = 0
+        self._pending = []
+        self._lock = threading.RLock()
+        self._maintenance = None
+        self._maintenance_thread = None
+
+    @property
+    def is_built(self):
+        return self.vectorizer is not None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, job_id):
+        return job_id in self.positions
+
+    def build(self, job_ids, documents):
+        job_ids = list(job_ids)
+        documents = list(documents)
+        if not job_ids:
+            logger.warning("No jobs to index, leaving job index empty")
+            return self
+
+        vectorizer = TfidfVectorizer()
+        matrix = vectorizer.fit_transform(documents).tocsr()
+
+        with self._lock:
+            self._install(vectorizer, matrix, job_ids, documents)
+            self.positions = {job_id: position for position, job_id in enumerate(job_ids)}
+            self.tombstones = set(range(len(job_ids))) - set(self.positions.values())
+        logger.info(f"Built job index over {len(self)} jobs ({len(vectorizer.vocabulary_)} terms)")
+        return self
+
+    def _install(self, vectorizer, matrix, job_ids, documents):
+        # Callers hold the lock and set positions and tombstones for the new rows
+        self.vectorizer = vectorizer
+        self.build_id = uuid.uuid4().hex
+        self.matrix = matrix
+        self.job_ids = job_ids
+        self.documents = documents
+        self._pending = []
+        self.fitted_rows = len(job_ids)
+        self.appended_rows = 0
+        self.unseen_term_rows = 0
+
+    def upsert(self, job_ids, documents):
+        """Append new or updated jobs, tombstoning the rows they replace.
+
+        Terms outside the fitted vocabulary are ignored until the next refit,
+        which these rows bring closer. Does nothing if the index has not been
+        built yet.
+        """
+        job_ids = list(job_ids)
+        documents = list(documents)
+        if not self.is_built or not job_ids:
+            return 0
+
+        with self._lock:
+            analyzer = self.vectorizer.build_analyzer()
+            vocabulary = self.vectorizer.vocabulary_
+            self._pending.append(self.vectorizer.transform(documents))
+            if self.documents is not None:
+                self.documents.extend(documents)
+            self.appended_rows += len(job_ids)
+            self.unseen_term_rows += sum(
+                any(term not in vocabulary for term in analyzer(document)) for document in documents
+            )
+            for job_id in job_ids:
+                previous = self.positions.get(job_id)
+                if previous is not None:
+                    self.tombstones.add(previous)
+                self.positions[job_id] = len(self.job_ids)
+                self.job_ids.append(job_id)
+            self._schedule_maintenance()
+        return len(job_ids)
+
+    def _flush(self):
+        with self._lock:
+            if self._pending:
+                self.matrix = sparse.vstack([self.matrix] + self._pending, format='csr')
+                self._pending = []
+            return self.matrix
+
+    @property
+    def needs_compaction(self):
+        return bool(self.job_ids) and len(self.tombstones) > self.compaction_threshold * len(self.job_ids)
+
+    @property
+    def needs_refit(self):
+        if self.documents is None:
+            return False
+        fitted_rows = max(self.fitted_rows, 1)
+        return (self.unseen_term_rows > self.refit_threshold * fitted_rows
+                or self.appended_rows > fitted_rows)
+
+    def compact(self):
+        """Drop tombstoned rows and refit the vocabulary and IDF over the live documents.
+
+        The fit runs outside the lock; jobs upserted meanwhile are transformed
+        with the new vectorizer before it is swapped in.
+        """
+        if self.documents is None:
+            self._drop_tombstones()
+            return
+        with self._lock:
+            self._flush()
+            build_id = self.build_id
+            count = len(self.job_ids)
+            live = [position for position in range(count) if position not in self.tombstones]
+            documents = [self.documents[position] for position in live]
+        if not live:
+            self._drop_tombstones()
+            return
+
+        vectorizer = TfidfVectorizer()
+        matrix = vectorizer.fit_transform(documents).tocsr()
+
+        with self._lock:
+            if self.build_id != build_id:
+                # Rebuilt while we were fitting
+                return
+            self._flush()
+            later = list(range(count, len(self.job_ids)))
+            if later:
+                matrix = sparse.vstack(
+                    [matrix, vectorizer.transform([self.documents[position] for position in later])], format='csr'
+                )
+            kept = live + later
+            remap = {position: row for row, position in enumerate(kept)}
+            removed = len(self.job_ids) - len(kept)
+            tombstones = {remap[position] for position in self.tombstones if position in remap}
+            positions = {job_id: remap[position] for job_id, position in self.positions.items()}
+            self._install(vectorizer, matrix, [self.job_ids[position] for position in kept],
+                          [self.documents[position] for position in kept])
+            self.positions = positions
+            self.tombstones = tombstones
+        logger.info(f"Compacted job index, dropped {removed} tombstoned rows and refitted "
+                    f"{len(vectorizer.vocabulary_)} terms")
+
+    def _drop_tombstones(self):
+        with self._lock:
+            matrix = self._flush()
+            if not self.tombstones:
+                return
+            keep = [position for position in range(len(self.job_ids)) if position not in self.tombstones]
+            self.matrix = matrix[keep]
+            self.job_ids = [self.job_ids[position] for position in keep]
+            self.positions = {job_id: position for position, job_id in enumerate(self.job_ids)}
+            removed = len(self.tombstones)
+            self.tombstones = set()
+        logger.info(f"Compacted job index, dropped {removed} tombstoned rows")
+
+    def _schedule_maintenance(self):
+        # Debounced so a burst of upserts from one scrape costs a single compaction/save
+        if self._maintenance is None:
+            self._maintenance = threading.Timer(self.maintenance_delay, self._run_maintenance)
+            self._maintenance.daemon = True
+            self._maintenance.start()
+            self._maintenance_thread = self._maintenance
+
+    def _run_maintenance(self):
+        with self._lock:
+            self._maintenance = None
+        try:
+            if self.needs_compaction or self.needs_refit:
+                self.compact()
+            self.save()
+        except Exception as e:
+            logger.error(f"Error maintaining job index: {str(e)}")
+
+    def wait_for_maintenance(self, timeout=None):
+        maintenance = self._maintenance_thread
+        if maintenance is not None:
+            maintenance.join(timeout)
+
+    def snapshot(self, job_ids):
+        """The vectorizer and the rows of the given jobs, read together so a refit cannot split them."""
+        with self._lock:
+            return self.vectorizer, self._flush()[[self.positions[job_id] for job_id in job_ids]]
+
+    def similarities_to(self, job_ids, document, documents=None):
+        """Cosine similarity of a preprocessed document to the given jobs, in the order asked for.
+
+        Positions are looked up and scored under one lock acquisition, so a
+        concurrent compaction cannot remap rows in between. Jobs missing from
+        the index are scored from ``documents`` (job id -> preprocessed text)
+        with the same vectorizer, or score 0.
+        """
+        scores = np.zeros(len(job_ids))
+        with self._lock:
+            vector = self.vectorizer.transform([document])
+            positions = [self.positions.get(job_id) for job_id in job_ids]
+            indexed = [i for i, position in enumerate(positions) if position is not None]
+            if indexed:
+                rows = self._flush()[[positions[i] for i in indexed]]
+                scores[indexed] = (rows @ vector.T).toarray().ravel()
+            unindexed = [i for i, position in enumerate(positions)
+                         if position is None and documents and job_ids[i] in documents]
+            if unindexed:
+                rows = self.vectorizer.transform([documents[job_ids[i]] for i in unindexed])
+                scores[unindexed] = (rows @ vector.T).toarray().ravel()
+        return scores
+
+    def save(self, path=None):
+        path = path or self.path
+        if path is None or not self.is_built:
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._lock:
+            state = {
+                'vectorizer': self.vectorizer,
+                'build_id': self.build_id,
+                'matrix': self._flush(),
+                'job_ids': list(self.job_ids),
+                'documents': list(self.documents) if self.documents is not None else None,
+                'tombstones': set(self.tombstones),
+                'fitted_rows': self.fitted_rows,
+                'appended_rows': self.appended_rows,
+                'unseen_term_rows': self.unseen_term_rows,
+            }
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved job index to {path}")
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        index = cls(path, **kwargs)
+        if not path or not os.path.exists(path):
+            return index
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+            tombstones = state.get('tombstones', set())
+            index.vectorizer = state['vectorizer']
+            index.build_id = state.get('build_id')
+            index.matrix = state['matrix']
+            index.job_ids = state['job_ids']
+            # Indexes saved before documents were kept can only be refitted by a full rebuild
+            index.documents = state.get('documents')
+            index.tombstones = tombstones
+            index.fitted_rows = state.get('fitted_rows', len(index.job_ids))
+            index.appended_rows = state.get('appended_rows', 0)
+            index.unseen_term_rows = state.get('unseen_term_rows', 0)
+            index.positions = {
+                job_id: position for position, job_id in enumerate(index.job_ids)
+                if position not in tombstones
+            }
+            logger.info(f"Loaded job index with {len(index)} jobs from {path}")
+        except Exception as e:
+            logger.error(f"Error loading job index from {path}: {str(e)}")
+        return index
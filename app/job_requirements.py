@@ -0,0 +1,22 @@
+import re
+
+# "3+ years of experience", "2-4 yrs' commercial experience", "5 to 7 years experience"
+_YEARS = r'(\d{1,2})\s*\+?\s*(?:(?:-|–|to)\s*\d{1,2}\s*\+?\s*)?(?:years?|yrs?)\b[\'’]?'
+REQUIRED_YEARS_PATTERN = re.compile(
+    rf'\b{_YEARS}(?=[^.;\n]{{0,40}}?\bexperience\b)'
+    # "experience: 4 years", "experience of at least 3 years"
+    rf'|\bexperience\b[^.;\n\d]{{0,25}}?\b{_YEARS}',
+    re.IGNORECASE
+)
+
+
+def extract_required_years(description):
+    """Lower bound of the first experience requirement in a job description; 0 when none is given.
+
+    Only years tied to the word "experience" within the same clause count, so
+    "20 years of growth" or "founded 30 years ago" are not read as requirements.
+    """
+    match = REQUIRED_YEARS_PATTERN.search(description or '')
+    if not match:
+        return 0.0
+    return float(match.group(1) or match.group(2))
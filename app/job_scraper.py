@@ -1,9 +1,19 @@
 import requests
 import os
 import logging
-import re
+import time
+import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from app.database import DatabaseManager
+from app.job_index import JobIndex
+from app.job_requirements import extract_required_years
+from app.matching_engine import MatchingEngine
+from app.skill_matcher import get_skill_matcher
+from app.api_cache import get_response_cache
+from app.metrics import timed
 from datetime import datetime
 
 load_dotenv()
@@ -11,44 +21,139 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _normalize_terms(value):
+    # Searches differing only in case or spacing share a cache entry
+    return ' '.join((value or '').lower().split())
+
 
 class AdzunaJobScraper:
-    def __init__(self):
+    # Responses worth retrying: rate limiting and transient server errors
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(self, db_manager=None, base_url="https://api.adzuna.com/v1/api/jobs", max_workers=4,
+                 max_retries=3, backoff_factor=0.5, max_backoff=30, timeout=10, skill_matcher=None, cache=None):
         self.app_id = os.getenv('ADZUNA_APP_ID')
         self.api_key = os.getenv('ADZUNA_API_KEY')
-        self.base_url = "https://api.adzuna.com/v1/api/jobs"
-        self.db_manager = DatabaseManager()
-
-    def scrape_jobs(self, query, location, num_pages=1, results_per_page=10):
-        all_jobs = []
-        for page in range(1, num_pages + 1):
-            url = f"{self.base_url}/gb/search/{page}"
-            params = {
-                'app_id': self.app_id,
-                'app_key': self.api_key,
-                'results_per_page': results_per_page,
-                'what': query,
-                'where': location,
-                'content-type': 'application/json'
-            }
-
-            logger.info(f"Scraping page {page}: {url}")
-
-            response = requests.get(url, params=params)
-
-            if response.status_code == 200:
-                data = response.json()
-                jobs = self._parse_jobs(data)
-                all_jobs.extend(jobs)
+        self.base_url = base_url
+        self.db_manager = db_manager or DatabaseManager()
+        self.skill_matcher = skill_matcher or get_skill_matcher()
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        # Upper bound on any wait, including one asked for by a Retry-After header
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        # Shared across scrapers, so repeated searches are served without spending API quota
+        self.cache = cache or get_response_cache()
+
+        # One pooled session so pages reuse keep-alive connections instead of new TLS handshakes
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _retry_delay(self, response, attempt):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return min(self.backoff_factor * (2 ** attempt) * (1 + random.random()), self.max_backoff)
+
+    def _cache_key(self, kind, query, location, page, results_per_page):
+        return self.cache.make_key(kind, self.base_url, _normalize_terms(query), _normalize_terms(location),
+                                   page, results_per_page)
+
+    def fetch_page(self, query, location, page, results_per_page=10):
+        """The JSON response for one results page, served from the cache when fresh."""
+        return self.cache.get_or_fetch(
+            self._cache_key('page', query, location, page, results_per_page),
+            lambda: self._fetch_page(query, location, page, results_per_page)
+        )
+
+    @timed('job_scraper', 'fetch_page')
+    def _fetch_page(self, query, location, page, results_per_page=10):
+        url = f"{self.base_url}/gb/search/{page}"
+        params = {
+            'app_id': self.app_id,
+            'app_key': self.api_key,
+            'results_per_page': results_per_page,
+            'what': query,
+            'where': location,
+            'content-type': 'application/json'
+        }
 
-                # Store jobs in the database
-                for job in jobs:
-                    self.db_manager.add_job(job)
-            else:
-                logger.error(f"Failed to retrieve page {page}. Status code: {response.status_code}")
+        logger.info(f"Scraping page {page}: {url}")
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                if response.status_code == 200:
+                    return response.json()
+                retryable = response.status_code in self.RETRY_STATUS_CODES
+                error = f"status code {response.status_code}"
+            except requests.RequestException as e:
+                retryable = True
+                error = str(e)
+
+            if not retryable or attempt == self.max_retries:
+                logger.error(f"Failed to retrieve page {page}: {error}")
+                return None
+            delay = self._retry_delay(response, attempt)
+            logger.warning(f"Retrying page {page} in {delay:.2f}s after {error}")
+            time.sleep(delay)
+
+    def fetch_pages(self, query, location, num_pages=1, results_per_page=10):
+        """Yield (page, data) in page order while fetching up to max_workers pages concurrently.
+
+        Stops after the first page with fewer than ``results_per_page`` results;
+        data is None for pages that could not be retrieved.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = {}
+            next_page = 1
+            while in_flight or next_page <= num_pages:
+                while next_page <= num_pages and len(in_flight) < self.max_workers:
+                    in_flight[next_page] = executor.submit(
+                        self.fetch_page, query, location, next_page, results_per_page
+                    )
+                    next_page += 1
+
+                page = min(in_flight)
+                data = in_flight.pop(page).result()
+                yield page, data
+
+                if data is not None and len(data.get('results', [])) < results_per_page:
+                    for future in in_flight.values():
+                        future.cancel()
+                    return
+
+    def iter_job_pages(self, query, location, num_pages=1, results_per_page=10):
+        """Yield the parsed jobs of each page as soon as it arrives."""
+        for page, data in self.fetch_pages(query, location, num_pages, results_per_page):
+            if data is not None:
+                # Parsed pages are kept in memory only, next to the response they came from
+                jobs = self.cache.get_or_fetch(
+                    self._cache_key('jobs', query, location, page, results_per_page),
+                    lambda: self._parse_jobs(data), persist=False
+                )
+                yield [dict(job) for job in jobs]
+
+    def iter_jobs(self, query, location, num_pages=1, results_per_page=10, store=True):
+        """Stream parsed jobs page by page, storing each page before its jobs are yielded.
+
+        Only one page is held in memory at a time, so long crawls run in constant
+        memory and start persisting before the last page arrives.
+        """
+        for jobs in self.iter_job_pages(query, location, num_pages, results_per_page):
+            if store:
+                # Store the whole page in one transaction
+                self.db_manager.add_jobs(jobs)
+            yield from jobs
 
-        return all_jobs
+    def scrape_jobs(self, query, location, num_pages=1, results_per_page=10):
+        return list(self.iter_jobs(query, location, num_pages, results_per_page))
 
+    @timed('job_scraper', 'parse_jobs')
     def _parse_jobs(self, data):
         jobs = []
         for job in data.get('results', []):
@@ -68,27 +173,32 @@ class AdzunaJobScraper:
                 'description': job.get('description'),
                 'url': job.get('redirect_url'),
                 'salary': salary,
-                'skills': ','.join(self._extract_skills(job.get('description', ''))),
+                'skills': ','.join(self._extract_skills(job.get('description') or '')),
+                'required_years': self._extract_required_years(job.get('description') or ''),
                 'created_at': created_at
             }
             jobs.append(parsed_job)
         return jobs
 
     def _extract_skills(self, description):
-        common_skills = ['python', 'java', 'c++', 'javascript', 'react', 'node.js', 'sql', 'machine learning',
-                         'data analysis']
-        found_skills = []
-        for skill in common_skills:
-            if re.search(r'\b' + re.escape(skill) + r'\b', description.lower()):
-                found_skills.append(skill)
-        return found_skills
+        return self.skill_matcher.find(description)
+
+    def _extract_required_years(self, description):
+        return extract_required_years(description)
 
     def get_job_summary(self, jobs):
-        total_jobs = len(jobs)
-        companies = set(job['company'] for job in jobs)
-        locations = set(job['location'] for job in jobs)
-        all_skills = [skill for job in jobs for skill in job['skills'].split(',') if job['skills']]
-        top_skills = sorted(set(all_skills), key=all_skills.count, reverse=True)[:5]
+        # Single pass so ``jobs`` can be a stream such as iter_jobs()
+        total_jobs = 0
+        companies = set()
+        locations = set()
+        skill_counts = Counter()
+        for job in jobs:
+            total_jobs += 1
+            companies.add(job['company'])
+            locations.add(job['location'])
+            if job['skills']:
+                skill_counts.update(job['skills'].split(','))
+        top_skills = [skill for skill, _ in skill_counts.most_common(5)]
 
         return {
             'total_jobs': total_jobs,
@@ -98,8 +208,7 @@ class AdzunaJobScraper:
         }
 
     def scrape_and_store_jobs(self, query, location, num_pages=1):
-        jobs = self.scrape_jobs(query, location, num_pages)
-        summary = self.get_job_summary(jobs)
+        summary = self.get_job_summary(self.iter_jobs(query, location, num_pages))
 
         logger.info("Job Scraping Summary:")
         logger.info(f"Total Jobs: {summary['total_jobs']}")
@@ -111,8 +220,13 @@ class AdzunaJobScraper:
 
 
 def main():
-    scraper = AdzunaJobScraper()
+    db_manager = DatabaseManager()
+    job_index = JobIndex.load('job_index.pkl')
+    db_manager.add_job_listener(MatchingEngine(job_index=job_index).index_jobs)
+
+    scraper = AdzunaJobScraper(db_manager)
     summary = scraper.scrape_and_store_jobs("software engineer", "London", num_pages=2)
+    job_index.save()
 
     print("\nJob Scraping Complete!")
     print(f"Total Jobs Scraped: {summary['total_jobs']}")
@@ -1,8 +1,8 @@
-from flask import Blueprint, render_template, request, jsonify, current_app
-import os
+from flask import Blueprint, render_template, request, jsonify, current_app, url_for, Response
+from datetime import datetime
 from werkzeug.utils import secure_filename
 from app.job_scraper import AdzunaJobScraper
-from app.matching_engine import MatchingEngine
+from app import metrics
 
 bp = Blueprint('main', __name__)
 
@@ -20,6 +20,7 @@ def index():
 
 @bp.route('/upload', methods=['POST'])
 def upload_file():
+    """Save an uploaded resume and queue it for parsing."""
     if 'file' not in request.files:
         return jsonify({'error': 'No file part'}), 400
     file = request.files['file']
@@ -28,44 +29,44 @@ def upload_file():
     if file and allowed_file(file.filename):
         try:
             filename = secure_filename(file.filename)
-            filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
+            data = file.read()
+            resume_id = request.form.get('resume_id')
 
-            current_app.logger.info(f"File saved to: {filepath}")
+            # Identical files already parsed are answered straight from the database
+            if not resume_id:
+                cached = current_app.resume_parser.cached_resume(current_app.resume_parser.content_hash(data))
+                if cached is not None:
+                    return jsonify({'resume_id': cached['id'], 'status': 'done', 'cached': True}), 200
 
-            # Use the ResumeParser instance attached to the app
-            resume_data = current_app.resume_parser.parse_resume(filepath, filename)
-
-            if resume_data is None:
-                return jsonify({'error': 'Failed to parse resume'}), 500
-
-            current_app.logger.info(f"Resume data after parsing: {resume_data}")
-
-            # Ensure all required fields are present
-            required_fields = ['name', 'email', 'phone', 'skills', 'experience', 'education']
-            for field in required_fields:
-                if field not in resume_data:
-                    resume_data[field] = '' if field != 'skills' else []
-
-            current_app.logger.info(f"Resume data before adding to database: {resume_data}")
-
-            resume_id = current_app.db_manager.add_resume(resume_data)
+            # Parsing (and possibly OCR) runs on the resume queue's worker pool, straight from the uploaded bytes
+            job_id = current_app.resume_queue.submit(filename, payload=data, resume_id=resume_id)
+            current_app.logger.info(f"Queued {filename} ({len(data)} bytes) as upload job {job_id}")
 
             return jsonify({
-                'resume_id': resume_id,
-                'name': resume_data.get('name'),
-                'email': resume_data.get('email'),
-                'phone': resume_data.get('phone'),
-                'skills': resume_data.get('skills'),
-                'experience': resume_data.get('experience'),
-                'education': resume_data.get('education')
-            }), 200
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': url_for('main.upload_status', job_id=job_id)
+            }), 202
         except Exception as e:
-            current_app.logger.error(f"Error processing resume: {str(e)}", exc_info=True)
+            current_app.logger.error(f"Error queueing resume: {str(e)}", exc_info=True)
             return jsonify({'error': 'An error occurred while processing the resume'}), 500
     else:
         return jsonify({'error': 'File type not allowed'}), 400
 
+@bp.route('/upload/<string:job_id>/status')
+def upload_status(job_id):
+    """Report the progress of a queued resume upload."""
+    task = current_app.resume_queue.get_status(job_id)
+    if task is None:
+        return jsonify({'error': 'Upload job not found'}), 404
+    return jsonify({
+        'job_id': task['id'],
+        'status': task['status'],
+        'progress': task['progress'],
+        'resume_id': task['resume_id'],
+        'error': task['error']
+    }), 200
+
 @bp.route('/resume/<string:resume_id>')
 def view_resume(resume_id):
     """Display the parsed resume details."""
@@ -77,26 +78,68 @@ def view_resume(resume_id):
 @bp.route('/matches/<string:resume_id>')
 def view_matches(resume_id):
     """Display the top matches for a given resume."""
-    matching_engine = MatchingEngine()
-    matches = matching_engine.get_top_matches(resume_id, limit=10)
+    matches = current_app.matching_engine.get_top_matches(resume_id, limit=10)
     return render_template('matches.html', matches=matches, resume_id=resume_id)
 
+@bp.route('/api/jobs/<string:job_id>/candidates', methods=['GET'])
+def job_candidates(job_id):
+    """Best matching resumes for a job, as scored by the all-pairs refresh."""
+    limit = int(request.args.get('limit', 10))
+    candidates = current_app.matching_engine.get_top_candidates(job_id, limit=limit)
+    return jsonify({
+        'job_id': job_id,
+        'candidates': [dict(match_result, resume=resume) for resume, match_result in candidates]
+    }), 200
+
+def _is_recent(value):
+    return value is not None and (
+        datetime.utcnow() - datetime.fromisoformat(str(value)) <= current_app.config['JOB_SEARCH_MAX_AGE'])
+
+def _search_is_stale(jobs):
+    """True when none of the results were updated recently enough."""
+    times = [job['updated_at'] for job in jobs if job['updated_at']]
+    return not times or not _is_recent(max(datetime.fromisoformat(str(value)) for value in times))
+
 @bp.route('/api/jobs/search', methods=['GET'])
 def search_jobs():
-    """Search for jobs using the Adzuna job scraper."""
+    """Search stored jobs, refreshing from the Adzuna job scraper only when local results are stale or too few.
+
+    A search refreshed within JOB_SEARCH_MAX_AGE is always served locally,
+    even when the live API had fewer results than a page.
+    """
     query = request.args.get('query', 'software engineer')
     location = request.args.get('location', 'London')
-    page = int(request.args.get('page', 1))
     results_per_page = int(request.args.get('results_per_page', 10))
+    cursor = request.args.get('cursor')
+    # 'local' never calls the live API
+    allow_live = request.args.get('source', 'auto') != 'local'
 
-    scraper = AdzunaJobScraper()
+    db_manager = current_app.db_manager
     try:
-        jobs = scraper.scrape_jobs(query, location, num_pages=page, results_per_page=results_per_page)
+        jobs, next_cursor = db_manager.search_jobs(query, location, limit=results_per_page, cursor=cursor)
+        query_key = f"{query.strip().lower()}|{location.strip().lower()}"
+        refreshed = False
+        recently_refreshed = _is_recent(db_manager.get_search_refreshed_at(query_key))
+        if allow_live and cursor is None and not recently_refreshed and (
+                len(jobs) < results_per_page or _search_is_stale(jobs)):
+            try:
+                scraper = AdzunaJobScraper(db_manager, cache=current_app.api_cache)
+                scraped = scraper.scrape_jobs(query, location, num_pages=1, results_per_page=results_per_page)
+                # Recorded even when empty, so a small result set is not re-fetched on every request
+                db_manager.mark_search_refreshed(query_key)
+                refreshed = True
+                if scraped:
+                    # Scraped jobs are stored and indexed, so the local search now sees them
+                    jobs, next_cursor = db_manager.search_jobs(query, location, limit=results_per_page)
+            except Exception as e:
+                # Stored results are still better than none
+                current_app.logger.error(f"Live job search failed: {str(e)}")
         return jsonify({
             'query': query,
             'location': location,
-            'page': page,
             'results_per_page': results_per_page,
+            'source': 'live' if refreshed else 'local',
+            'next_cursor': next_cursor,
             'jobs': jobs
         }), 200
     except Exception as e:
@@ -105,14 +148,20 @@ def search_jobs():
 @bp.route('/scrape_jobs')
 def scrape_jobs():
     """Scrape jobs from Adzuna."""
-    scraper = AdzunaJobScraper()
+    scraper = AdzunaJobScraper(current_app.db_manager, cache=current_app.api_cache)
     jobs = scraper.scrape_jobs("software engineer", "London", num_pages=2)
     return jsonify({'message': f'Scraped {len(jobs)} jobs'})
 
 @bp.route('/health')
 def health_check():
     """Health check endpoint."""
-    return jsonify({'status': 'healthy'}), 200
+    return jsonify({'status': 'healthy', 'api_cache': current_app.api_cache.stats()}), 200
+
+@bp.route('/metrics')
+def metrics_endpoint():
+    """Stage and request latency histograms in the Prometheus text format."""
+    body = metrics.render(metrics.render_stats('resume_matcher_api_cache', current_app.api_cache.stats()))
+    return Response(body, mimetype='text/plain; version=0.0.4')
 
 @bp.errorhandler(404)
 def resource_not_found(e):
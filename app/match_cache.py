@@ -0,0 +1,21 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MatchCache:
+    """Resume/job scores persisted in match_results, keyed on (resume_id, job_id, config_version).
+
+    Lookups go straight to match_results through
+    DatabaseManager.get_unscored_job_ids and get_top_match_results. Rows are
+    invalidated in the same transaction as the write that makes them stale:
+    DatabaseManager.add_jobs drops a job's rows when its description or skills
+    change, and update_resume drops a resume's rows.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def put(self, resume_id, config_version, match_results):
+        if match_results:
+            self.db_manager.save_match_results(resume_id, config_version, match_results)
@@ -1,17 +1,98 @@
-import spacy
+import hashlib
+import json
+import logging
+import re
+import threading
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+from scipy import sparse
+from app.nlp_registry import get_nlp, DEFAULT_MODEL
+from app.match_cache import MatchCache
+from app.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+SCORE_COMPONENTS = ('total_score', 'keyword_score', 'semantic_score', 'experience_score')
+
+
+class _TopK:
+    """Running top ``k`` candidates by total score for each of ``size`` rows.
+
+    Scores of every component are kept for the selected candidates so they
+    can be written out without rescoring; unfilled slots hold candidate -1.
+    """
+
+    def __init__(self, size, k):
+        self.k = k
+        self.scores = np.full((len(SCORE_COMPONENTS), size, k), -np.inf)
+        self.candidates = np.full((size, k), -1, dtype=np.int64)
+
+    def push(self, rows, scores, candidates):
+        """Merge ``scores`` (components x len(rows) x n) for ``candidates`` (n,) into ``rows`` (a slice)."""
+        merged_scores = np.concatenate([self.scores[:, rows], scores], axis=2)
+        merged_candidates = np.concatenate(
+            [self.candidates[rows], np.broadcast_to(candidates, scores.shape[1:])], axis=1
+        )
+        keep = np.argpartition(-merged_scores[0], self.k - 1, axis=1)[:, :self.k]
+        self.scores[:, rows] = np.take_along_axis(merged_scores, keep[None], axis=2)
+        self.candidates[rows] = np.take_along_axis(merged_candidates, keep, axis=1)
+
+    def items(self):
+        rows, slots = np.nonzero(self.candidates >= 0)
+        for row, slot in zip(rows, slots):
+            yield row, self.candidates[row, slot], self.scores[:, row, slot]
 
 
 class MatchingEngine:
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
-        self.vectorizer = TfidfVectorizer()
+    # Pipeline components each task needs; everything else is disabled in nlp.pipe
+    LEMMA_COMPONENTS = ('tagger', 'attribute_ruler', 'lemmatizer')
+    NER_COMPONENTS = ('ner',)
+
+    # Bump SCORING_REVISION whenever scoring logic changes so cached scores are recomputed
+    SCORING_REVISION = 2
+    SCORING_WEIGHTS = {'keyword': 0.4, 'semantic': 0.4, 'experience': 0.2}
+
+    def __init__(self, job_index=None, db_manager=None, batch_size=64, n_process=1, min_shared_skills=0):
+        self.nlp = None
+        # Jobs sharing fewer skills with a resume are not scored at all; 0 scores every job
+        self.min_shared_skills = min_shared_skills
+        self.job_index = job_index
+        self.db_manager = db_manager
+        self.match_cache = MatchCache(db_manager) if db_manager is not None else None
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self._index_build_lock = threading.Lock()
+
+    def load_nlp(self):
+        if self.nlp is None:
+            self.nlp = get_nlp()
+        return self.nlp
+
+    def _disabled_components(self, nlp, components):
+        enabled = set(components)
+        # Keep the shared tok2vec only if one of the enabled components listens to it
+        if 'tok2vec' in nlp.pipe_names:
+            if enabled.intersection(nlp.get_pipe('tok2vec').listening_components):
+                enabled.add('tok2vec')
+        return [name for name in nlp.pipe_names if name not in enabled]
+
+    def pipe(self, texts, components):
+        nlp = self.load_nlp()
+        return nlp.pipe(
+            texts,
+            batch_size=self.batch_size,
+            n_process=self.n_process,
+            disable=self._disabled_components(nlp, components)
+        )
+
+    @timed('matching_engine', 'preprocess')
+    def preprocess_texts(self, texts):
+        docs = self.pipe((text.lower() for text in texts), self.LEMMA_COMPONENTS)
+        return [' '.join([token.lemma_ for token in doc if not token.is_stop and not token.is_punct]) for doc in docs]
 
     def preprocess_text(self, text):
-        doc = self.nlp(text.lower())
-        return ' '.join([token.lemma_ for token in doc if not token.is_stop and not token.is_punct])
+        return self.preprocess_texts([text])[0]
 
     def calculate_keyword_score(self, resume_skills, job_skills):
         resume_skills_set = set(resume_skills)
@@ -19,42 +100,145 @@ class MatchingEngine:
         matching_skills = resume_skills_set.intersection(job_skills_set)
         return len(matching_skills) / len(job_skills_set) if job_skills_set else 0
 
+    def _skill_matrix(self, skill_lists, vocabulary, grow=True):
+        # Binary CSR matrix with a row per skill list and a column per vocabulary skill
+        indices, indptr = [], [0]
+        for skills in skill_lists:
+            if grow:
+                columns = {vocabulary.setdefault(skill, len(vocabulary)) for skill in skills}
+            else:
+                columns = {vocabulary[skill] for skill in skills if skill in vocabulary}
+            indices.extend(sorted(columns))
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.ones(len(indices)), indices, indptr), shape=(len(skill_lists), len(vocabulary))
+        )
+
+    @timed('matching_engine', 'keyword')
+    def keyword_score_matrix(self, resume_skill_lists, job_skill_lists):
+        """Share of each job's skills found in each resume, as a resumes x jobs array.
+
+        Skills are encoded once as sparse binary matrices, so the overlap for
+        every pair is a single matrix product.
+        """
+        vocabulary = {}
+        job_matrix = self._skill_matrix(job_skill_lists, vocabulary)
+        # Resume skills no job asks for cannot overlap, so they are left out
+        resume_matrix = self._skill_matrix(resume_skill_lists, vocabulary, grow=False)
+        return self._keyword_scores(resume_matrix, job_matrix)
+
+    def _keyword_scores(self, resume_matrix, job_matrix):
+        overlap = (resume_matrix @ job_matrix.T).toarray()
+        job_counts = job_matrix.getnnz(axis=1)
+        return np.divide(overlap, job_counts, out=np.zeros_like(overlap), where=job_counts > 0)
+
+    def experience_score_matrix(self, resume_years, required_years):
+        """Experience score for every resume x job pair from numeric years."""
+        resume_years = np.asarray(resume_years, dtype=float)[:, None]
+        required_years = np.asarray(required_years, dtype=float)[None, :]
+        short = required_years > resume_years
+        return np.where(short, resume_years / np.where(short, required_years, 1.0), 1.0)
+
     def calculate_semantic_similarity(self, resume_text, job_description):
-        preprocessed_resume = self.preprocess_text(resume_text)
-        preprocessed_job = self.preprocess_text(job_description)
-        tfidf_matrix = self.vectorizer.fit_transform([preprocessed_resume, preprocessed_job])
+        preprocessed_resume, preprocessed_job = self.preprocess_texts([resume_text, job_description])
+        return self._pairwise_similarity(preprocessed_resume, preprocessed_job)
+
+    def _pairwise_similarity(self, preprocessed_resume, preprocessed_job):
+        # A local vectorizer keeps the shared engine safe to call from concurrent requests
+        tfidf_matrix = TfidfVectorizer().fit_transform([preprocessed_resume, preprocessed_job])
         return cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
 
+    def build_job_index(self, jobs):
+        job_ids = [job['id'] for job in jobs]
+        documents = self.preprocess_texts([job.get('description') or '' for job in jobs])
+        self.job_index.build(job_ids, documents)
+        self.job_index.save()
+        return self.job_index
+
+    def ensure_job_index(self):
+        """Build the job index over every stored job if it is not built yet.
+
+        Concurrent first requests on a fresh deploy wait for a single build
+        instead of each running their own spaCy pass over every job.
+        """
+        if not self.job_index.is_built:
+            with self._index_build_lock:
+                if not self.job_index.is_built:
+                    self.build_job_index(self.db_manager.get_all_jobs())
+        return self.job_index
+
+    def index_jobs(self, jobs):
+        """Append new or updated jobs to the job index; used as a DatabaseManager job listener."""
+        if self.job_index is None or not self.job_index.is_built or not jobs:
+            return
+        documents = self.preprocess_texts([job.get('description') or '' for job in jobs])
+        self.job_index.upsert([job['id'] for job in jobs], documents)
+
     def calculate_experience_score(self, resume_experience, required_experience):
         # Simple scoring based on years of experience
-        resume_years = self.extract_years_of_experience(resume_experience)
-        required_years = self.extract_years_of_experience(required_experience)
+        resume_years, required_years = self.extract_years_of_experience_batch([resume_experience, required_experience])
+        return self._experience_score(resume_years, required_years)
+
+    def _experience_score(self, resume_years, required_years):
         if resume_years >= required_years:
             return 1.0
         else:
             return resume_years / required_years
 
+    def extract_years_of_experience_batch(self, experience_texts):
+        experience_texts = list(experience_texts)
+        years = [0] * len(experience_texts)
+        # Empty texts carry no dates, so keep them out of the NER pass entirely
+        positions = [position for position, text in enumerate(experience_texts) if text]
+        docs = self.pipe((experience_texts[position].lower() for position in positions), self.NER_COMPONENTS)
+        for position, doc in zip(positions, docs):
+            years[position] = self._years_from_doc(doc)
+        return years
+
     def extract_years_of_experience(self, experience_text):
+        return self.extract_years_of_experience_batch([experience_text])[0]
+
+    def _years_from_doc(self, doc):
         # This is a simplistic extraction. You might want to improve this.
-        doc = self.nlp(experience_text.lower())
         for ent in doc.ents:
             if ent.label_ == "DATE" and "year" in ent.text:
-                return int(ent.text.split()[0])
+                # "five years" or "the last 3 years" do not start with a digit
+                number = re.search(r'\d+', ent.text)
+                if number:
+                    return int(number.group())
         return 0
 
-    def match_resume_to_job(self, resume, job):
-        keyword_score = self.calculate_keyword_score(resume['skills'], job['skills'])
-        semantic_score = self.calculate_semantic_similarity(
-            ' '.join(resume['experience']) + ' ' + ' '.join(resume['education']),
-            job['description']
-        )
+    def match_resume_to_job(self, resume, job, semantic_score=None):
+        keyword_score = self.calculate_keyword_score(self._as_list(resume['skills']), self._as_list(job['skills']))
+        if semantic_score is None:
+            semantic_score = self.calculate_semantic_similarity(
+                self._resume_text(resume),
+                job['description']
+            )
         experience_score = self.calculate_experience_score(
-            ' '.join(resume['experience']),
+            self._as_text(resume['experience']),
             job.get('required_experience', '')
         )
+        return self._combine_scores(keyword_score, semantic_score, experience_score)
+
+    @property
+    def scoring_version(self):
+        """Identifies the scoring configuration that produced a cached score."""
+        config = {
+            'revision': self.SCORING_REVISION,
+            'weights': self.SCORING_WEIGHTS,
+            'model': DEFAULT_MODEL
+        }
+        return hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
 
+    def _weighted_total(self, keyword_score, semantic_score, experience_score):
+        weights = self.SCORING_WEIGHTS
+        return (keyword_score * weights['keyword'] + semantic_score * weights['semantic']
+                + experience_score * weights['experience']) * 100
+
+    def _combine_scores(self, keyword_score, semantic_score, experience_score):
         # Weighted average of scores
-        total_score = (keyword_score * 0.4 + semantic_score * 0.4 + experience_score * 0.2) * 100
+        total_score = self._weighted_total(keyword_score, semantic_score, experience_score)
 
         return {
             'total_score': round(total_score, 2),
@@ -63,11 +247,210 @@ class MatchingEngine:
             'experience_score': round(experience_score * 100, 2)
         }
 
-    def rank_jobs_for_resume(self, resume, jobs):
-        job_matches = []
-        for job in jobs:
-            match_result = self.match_resume_to_job(resume, job)
-            job_matches.append((job, match_result))
+    def _as_text(self, value):
+        # Stored resumes keep sections as strings, parsed ones may hold lists
+        return value if isinstance(value, str) else ' '.join(value)
+
+    def _as_list(self, value):
+        # Stored jobs keep skills as a comma-joined string
+        if isinstance(value, str):
+            return [item for item in value.split(',') if item]
+        return value
+
+    def _resume_text(self, resume):
+        return self._as_text(resume['experience']) + ' ' + self._as_text(resume['education'])
+
+    @timed('matching_engine', 'semantic')
+    def _semantic_scores(self, resume, jobs):
+        indexed = self.job_index is not None and self.job_index.is_built
+        unindexed = [i for i, job in enumerate(jobs) if not indexed or job.get('id') not in self.job_index]
+
+        # The resume and every job missing from the index go through one batched pass
+        documents = self.preprocess_texts(
+            [self._resume_text(resume)] + [jobs[i].get('description') or '' for i in unindexed]
+        )
+        preprocessed_resume, preprocessed_jobs = documents[0], documents[1:]
+
+        if indexed:
+            # Positions are resolved and scored under the index lock, so a compaction cannot remap them
+            return self.job_index.similarities_to(
+                [job.get('id') for job in jobs], preprocessed_resume,
+                {jobs[i].get('id'): document for i, document in zip(unindexed, preprocessed_jobs)}
+            )
+        scores = np.zeros(len(jobs))
+        for i, preprocessed_job in zip(unindexed, preprocessed_jobs):
+            scores[i] = self._pairwise_similarity(preprocessed_resume, preprocessed_job)
+        return scores
+
+    @timed('matching_engine', 'experience')
+    def _experience_years(self, resume, jobs):
+        required_years = np.array([job.get('required_years') or 0 for job in jobs], dtype=float)
+        # Jobs without the ingest-time column can still carry free-text requirements;
+        # those and the resume go through a single NER pass
+        missing = [i for i, job in enumerate(jobs) if job.get('required_years') is None and job.get('required_experience')]
+        resume_years, *extracted = self.extract_years_of_experience_batch(
+            [self._as_text(resume['experience'])] + [jobs[i]['required_experience'] for i in missing]
+        )
+        required_years[missing] = extracted
+        return resume_years, required_years
+
+    def score_jobs(self, resume, jobs):
+        """Score a resume against a list of jobs in one pass, returning arrays aligned with ``jobs``."""
+        jobs = list(jobs)
+        semantic_scores = self._semantic_scores(resume, jobs)
+        keyword_scores = self.keyword_score_matrix(
+            [self._as_list(resume['skills'])], [self._as_list(job['skills']) for job in jobs]
+        )[0]
+        resume_years, required_years = self._experience_years(resume, jobs)
+        experience_scores = self.experience_score_matrix([resume_years], required_years)[0]
+
+        return {
+            'total_score': self._weighted_total(keyword_scores, semantic_scores, experience_scores),
+            'keyword_score': keyword_scores * 100,
+            'semantic_score': semantic_scores * 100,
+            'experience_score': experience_scores * 100
+        }
+
+    def _match_result(self, scores, i):
+        return {name: round(float(values[i]), 2) for name, values in scores.items()}
+
+    def _top_k(self, values, k):
+        # Partial selection: only the k best are sorted
+        if k >= len(values):
+            return np.argsort(-values, kind='stable')
+        top = np.argpartition(-values, k - 1)[:k]
+        return top[np.argsort(-values[top], kind='stable')]
+
+    def rank_jobs_for_resume(self, resume, jobs, limit=None):
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        scores = self.score_jobs(resume, jobs)
+        order = self._top_k(scores['total_score'], limit or len(jobs))
+        return [(jobs[i], self._match_result(scores, i)) for i in order]
+
+    def _shared_skills_filter(self, resume):
+        # A resume without skills gives the inverted index nothing to prefilter on
+        if self.min_shared_skills and self._as_list(resume['skills']):
+            return self.min_shared_skills
+        return 0
+
+    @timed('matching_engine', 'get_top_matches')
+    def get_top_matches(self, resume_id, limit=10):
+        """Top ``limit`` (job, match_result) pairs for a stored resume.
+
+        With ``min_shared_skills`` set, only jobs sharing that many skills with
+        the resume (found through the skill inverted index) are considered.
+        Only candidate jobs without a stored score for the current scoring
+        version are scored; the top ``limit`` then comes straight from
+        match_results, so repeat views never load every score.
+        """
+        resume = self.db_manager.get_resume(resume_id)
+        if resume is None:
+            return []
+
+        if self.job_index is not None:
+            self.ensure_job_index()
+
+        min_shared = self._shared_skills_filter(resume)
+        config_version = self.scoring_version
+        missing = self.db_manager.get_unscored_job_ids(resume_id, config_version, min_shared)
+        if missing:
+            missing_jobs = self.db_manager.get_jobs(missing)
+            if self.job_index is not None:
+                self.index_jobs([job for job in missing_jobs if job['id'] not in self.job_index])
+            scores = self.score_jobs(resume, missing_jobs)
+            scored = [dict(self._match_result(scores, i), job_id=job['id']) for i, job in enumerate(missing_jobs)]
+            self.match_cache.put(resume_id, config_version, scored)
+
+        top = self.db_manager.get_top_match_results(config_version, resume_id=resume_id, limit=limit,
+                                                    min_shared=min_shared)
+        jobs = {job['id']: job for job in self.db_manager.get_jobs([row['job_id'] for row in top])}
+        return [(jobs[row['job_id']], row) for row in top if row['job_id'] in jobs]
+
+    @timed('matching_engine', 'get_top_candidates')
+    def get_top_candidates(self, job_id, limit=10):
+        """Top ``limit`` (resume, match_result) pairs for a job, from the scores stored by match_all."""
+        rows = self.db_manager.get_top_match_results(self.scoring_version, job_id=job_id, limit=limit)
+        candidates = []
+        for row in rows:
+            resume = self.db_manager.get_resume(row['resume_id'])
+            if resume is not None:
+                candidates.append((resume, row))
+        return candidates
+
+    @timed('matching_engine', 'match_all')
+    def match_all(self, k=10, resume_block_size=256, job_block_size=4096):
+        """Score every resume against every job and store each resume's and each job's top ``k``.
+
+        Resumes are streamed from the database in blocks and scored against
+        the job corpus one resume_block_size x job_block_size tile at a time,
+        so the dense score matrix is never materialised. Besides the compact
+        per-job features (TF-IDF rows, skill matrix, required years) only k
+        scores per job and per resume of the current block are held.
+        """
+        if self.job_index is None:
+            raise ValueError("match_all needs a job index")
+        self.ensure_job_index()
+        config_version = self.scoring_version
+        self.db_manager.delete_stale_match_results(config_version)
+
+        job_ids, job_skills, required_years = [], [], []
+        for jobs in self.db_manager.iter_jobs():
+            self.index_jobs([job for job in jobs if job['id'] not in self.job_index])
+            job_ids.extend(job['id'] for job in jobs)
+            job_skills.extend(self._as_list(job['skills'] or '') for job in jobs)
+            required_years.extend(job.get('required_years') or 0 for job in jobs)
+        if not job_ids:
+            return {'resumes': 0, 'jobs': 0, 'stored': 0}
+
+        vocabulary = {}
+        job_skill_matrix = self._skill_matrix(job_skills, vocabulary)
+        # Resumes are transformed with the vectorizer the job rows came from, even if the index is refitted meanwhile
+        vectorizer, job_vectors = self.job_index.snapshot(job_ids)
+        required_years = np.array(required_years, dtype=float)
+
+        resume_ids = []
+        job_top = _TopK(len(job_ids), k)
+        stored = 0
+        for resumes in self.db_manager.iter_resumes(resume_block_size):
+            offset = len(resume_ids)
+            resume_ids.extend(resume['id'] for resume in resumes)
+            resume_vectors = vectorizer.transform(
+                self.preprocess_texts([self._resume_text(resume) for resume in resumes])
+            )
+            resume_years = self.extract_years_of_experience_batch(
+                [self._as_text(resume['experience']) for resume in resumes]
+            )
+            resume_skill_matrix = self._skill_matrix(
+                [self._as_list(resume['skills']) for resume in resumes], vocabulary, grow=False
+            )
+
+            resume_top = _TopK(len(resumes), k)
+            for start in range(0, len(job_ids), job_block_size):
+                end = min(start + job_block_size, len(job_ids))
+                semantic = (resume_vectors @ job_vectors[start:end].T).toarray()
+                keyword = self._keyword_scores(resume_skill_matrix, job_skill_matrix[start:end])
+                experience = self.experience_score_matrix(resume_years, required_years[start:end])
+                tile = np.stack([
+                    self._weighted_total(keyword, semantic, experience), keyword * 100, semantic * 100, experience * 100
+                ])
+                resume_top.push(slice(None), tile, np.arange(start, end))
+                job_top.push(slice(start, end), tile.transpose(0, 2, 1), np.arange(offset, offset + len(resumes)))
+
+            rows = [self._top_k_row(resume_ids[offset + row], job_ids[job], scores)
+                    for row, job, scores in resume_top.items()]
+            self.db_manager.save_match_results_bulk(config_version, rows)
+            stored += len(rows)
+
+        # Upserted, so pairs already stored from the resume side are simply refreshed
+        rows = [self._top_k_row(resume_ids[resume], job_ids[row], scores) for row, resume, scores in job_top.items()]
+        self.db_manager.save_match_results_bulk(config_version, rows)
+        stored += len(rows)
+        logger.info(f"Matched {len(resume_ids)} resumes against {len(job_ids)} jobs, stored {stored} top-{k} scores")
+        return {'resumes': len(resume_ids), 'jobs': len(job_ids), 'stored': stored}
 
-        # Sort jobs by total score in descending order
-        return sorted(job_matches, key=lambda x: x[1]['total_score'], reverse=True)
\ No newline at end of file
+    def _top_k_row(self, resume_id, job_id, scores):
+        row = {name: round(float(value), 2) for name, value in zip(SCORE_COMPONENTS, scores)}
+        row.update(resume_id=resume_id, job_id=job_id)
+        return row
@@ -0,0 +1,181 @@
+import os
+import time
+import random
+import cProfile
+import logging
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, from a cached lookup to a multi-page OCR
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+class Histogram:
+    """Thread-safe Prometheus-style histogram with one series per label combination."""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labelvalues):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def snapshot(self, *labelvalues):
+        """(count, sum) observed for one label combination."""
+        with self._lock:
+            series = self._series.get(labelvalues)
+            return (series[2], series[1]) if series else (0, 0.0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labelvalues, (list(counts), total, count))
+                            for labelvalues, (counts, total, count) in self._series.items())
+        for labelvalues, (counts, total, count) in series:
+            labels = list(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+STAGE_SECONDS = Histogram('resume_matcher_stage_seconds', 'Time spent in each pipeline stage.',
+                          ('component', 'stage'))
+REQUEST_SECONDS = Histogram('resume_matcher_request_seconds', 'Time spent serving HTTP requests.',
+                            ('endpoint', 'method', 'status'))
+HISTOGRAMS = [STAGE_SECONDS, REQUEST_SECONDS]
+
+
+def stage_timer(component, stage):
+    """Context manager recording the time of a pipeline stage."""
+    return STAGE_SECONDS.time(component, stage)
+
+
+def timed(component, stage):
+    """Decorator recording every call of a function as a pipeline stage."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with STAGE_SECONDS.time(component, stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def render_stats(prefix, stats, gauges=('entries',)):
+    """Prometheus text for a dict of counters, such as ResponseCache.stats()."""
+    lines = []
+    for key, value in stats.items():
+        if key in gauges:
+            lines += [f"# TYPE {prefix}_{key} gauge", f"{prefix}_{key} {value}"]
+        else:
+            lines += [f"# TYPE {prefix}_{key}_total counter", f"{prefix}_{key}_total {value}"]
+    return lines
+
+
+def render(extra_lines=()):
+    """Every histogram of this process in the Prometheus text exposition format."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    lines.extend(extra_lines)
+    return '\n'.join(lines) + '\n'
+
+
+def init_app(app):
+    """Time every request and, when PROFILE_REQUESTS is on, dump cProfile stats of slow ones.
+
+    A request is profiled when it sends an ``X-Profile`` header or is picked
+    at PROFILE_SAMPLE_RATE; its stats are written to PROFILE_DIR if it took
+    at least PROFILE_MIN_SECONDS.
+    """
+    # Imported here so the timing helpers stay usable outside the web app
+    from flask import g, request
+
+    app.config.setdefault('PROFILE_REQUESTS', False)
+    app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+    app.config.setdefault('PROFILE_MIN_SECONDS', 0.5)
+    app.config.setdefault('PROFILE_DIR', os.path.join(app.instance_path, 'profiles'))
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+        g.profiler = None
+        if app.config['PROFILE_REQUESTS'] and (
+                'X-Profile' in request.headers or random.random() < app.config['PROFILE_SAMPLE_RATE']):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is already active in this interpreter
+                return
+            g.profiler = profiler
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        endpoint = request.endpoint or 'unmatched'
+        REQUEST_SECONDS.observe(elapsed, endpoint, request.method, str(response.status_code))
+
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            if elapsed >= app.config['PROFILE_MIN_SECONDS']:
+                _dump_profile(profiler, app.config['PROFILE_DIR'], endpoint, elapsed)
+        return response
+
+    @app.teardown_request
+    def stop_profiler(exc):
+        # after_request does not run when a request fails before reaching it
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+
+
+def _dump_profile(profiler, directory, endpoint, elapsed):
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{int(elapsed * 1000)}ms.prof")
+        profiler.dump_stats(path)
+        logger.info(f"Wrote request profile to {path}")
+    except OSError as e:
+        logger.error(f"Error writing request profile: {str(e)}")
@@ -0,0 +1,60 @@
+import gc
+import logging
+import threading
+import spacy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "en_core_web_sm"
+# Tokenizer plus the rule-based sentencizer; no statistical components to load or run
+FAST_MODEL = "blank:en"
+
+_models = {}
+_lock = threading.Lock()
+
+
+def get_nlp(name=DEFAULT_MODEL):
+    """Return the process-wide instance of a spaCy model, loading it on first use.
+
+    ``blank:<lang>`` names a blank pipeline with only a sentencizer.
+    """
+    nlp = _models.get(name)
+    if nlp is None:
+        with _lock:
+            nlp = _models.get(name)
+            if nlp is None:
+                logger.info(f"Loading spaCy model {name}...")
+                nlp = _load(name)
+                _models[name] = nlp
+    return nlp
+
+
+def _load(name):
+    if name.startswith("blank:"):
+        nlp = spacy.blank(name.split(":", 1)[1])
+        nlp.add_pipe("sentencizer")
+        return nlp
+    return spacy.load(name)
+
+
+def warmup(names=(DEFAULT_MODEL,)):
+    """Load the models and run a tiny document through each so the first request pays nothing."""
+    for name in names:
+        get_nlp(name)("Warm up the pipeline.")
+
+
+def preload(names=(DEFAULT_MODEL,)):
+    """Load the models in the master process of a pre-fork server (e.g. ``gunicorn --preload``).
+
+    Freezing the GC afterwards moves the loaded objects out of the collected
+    generations, so workers never touch their pages and keep sharing them
+    copy-on-write with the master.
+    """
+    warmup(names)
+    gc.collect()
+    gc.freeze()
+
+
+def clear():
+    with _lock:
+        _models.clear()
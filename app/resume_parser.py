@@ -1,39 +1,100 @@
 import fitz  # PyMuPDF
-import pdfplumber
 import pytesseract
 import io
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from docx import Document
-import spacy
+from PIL import Image
 import re
 import os
 import logging
 from app.database import DatabaseManager
+from app.nlp_registry import get_nlp, DEFAULT_MODEL, FAST_MODEL
+from app.skill_matcher import get_skill_matcher
+from app.section_segmenter import SectionSegmenter
+from app.metrics import timed, stage_timer
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _ocr_page(image_bytes, timeout=30):
+    """OCR one rendered page (PNG bytes); runs in an OCR worker process.
+
+    A page tesseract cannot finish within ``timeout`` seconds yields an empty
+    string.
+    """
+    try:
+        return pytesseract.image_to_string(Image.open(io.BytesIO(image_bytes)), config='--psm 6', timeout=timeout)
+    except RuntimeError as e:
+        # pytesseract raises RuntimeError when the tesseract process times out
+        logger.warning(f"OCR of a page gave up: {str(e)}")
+        return ""
+
+
 class ResumeParser:
-    def __init__(self, db_manager):
+    # Bump PARSER_VERSION whenever extraction changes so cached parses are redone
+    PARSER_VERSION = 3
+    # Pages with less native text than this are treated as scanned and OCRed
+    MIN_PAGE_TEXT = 20
+    OCR_DPI = 300
+    # "fast" trades the statistical sentence boundaries of the full model for throughput
+    PARSE_MODES = {'full': DEFAULT_MODEL, 'fast': FAST_MODEL}
+    # Extraction only needs sentence boundaries; any other component is skipped
+    SENTENCE_COMPONENTS = ('tok2vec', 'parser', 'senter', 'sentencizer')
+
+    def __init__(self, db_manager, skill_matcher=None, ocr_workers=None, ocr_timeout=30, max_ocr_pages=20,
+                 section_headers=None, mode='full'):
+        if mode not in self.PARSE_MODES:
+            raise ValueError(f"Unknown parse mode: {mode}")
         self.nlp = None
+        self.mode = mode
         self.db_manager = db_manager
+        self.skill_matcher = skill_matcher or get_skill_matcher()
+        self.segmenter = SectionSegmenter(section_headers)
+        self.ocr_workers = ocr_workers or min(4, os.cpu_count() or 1)
+        self.ocr_timeout = ocr_timeout
+        self.max_ocr_pages = max_ocr_pages
+        self._ocr_pool = None
+
+    def _get_ocr_pool(self):
+        if self._ocr_pool is None:
+            # Forking the multi-threaded server process can deadlock on locks held by other threads
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            self._ocr_pool = ProcessPoolExecutor(max_workers=self.ocr_workers,
+                                                 mp_context=multiprocessing.get_context(start_method))
+        return self._ocr_pool
+
+    def close(self):
+        if self._ocr_pool is not None:
+            self._ocr_pool.shutdown()
+            self._ocr_pool = None
 
     def load_nlp(self):
         if self.nlp is None:
-            logger.info("Loading spaCy model...")
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = get_nlp(self.PARSE_MODES[self.mode])
         return self.nlp
 
-    def parse_resume(self, filepath, filename):
-        file_extension = os.path.splitext(filename)[1].lower()
+    def content_hash(self, data):
+        """Cache key for an uploaded file: SHA-256 of its bytes, the parser version and the parse mode."""
+        digest = hashlib.sha256(f"{self.PARSER_VERSION}:{self.mode}:".encode())
+        digest.update(data)
+        return digest.hexdigest()
+
+    def cached_resume(self, content_hash):
+        """The resume already parsed from identical file contents, or None."""
+        return self.db_manager.get_resume_by_hash(content_hash)
+
+    @timed('resume_parser', 'parse_resume')
+    def parse_resume(self, source, filename):
+        """Parse a resume from a file path or from the uploaded bytes."""
         try:
-            if file_extension == '.pdf':
-                text = self.parse_pdf(filepath)
-            elif file_extension == '.docx':
-                text = self.parse_docx(filepath)
-            else:
+            if not self.is_supported(filename):
                 return None, {"error": "Unsupported file format"}
 
+            text = self.extract_text(source, filename)
             if not text:
                 return None, {"error": "Failed to extract text from file"}
 
@@ -43,65 +104,106 @@ class ResumeParser:
             logger.error(f"Error parsing resume: {str(e)}")
             return None
 
-    def parse_pdf(self, filepath):
-        try:
-            with open(filepath, 'rb') as file:
-                # Try PyMuPDF first
-                pdf_document = fitz.open(filepath)
-                text = ""
-                for page in pdf_document:
-                    text += page.get_text()
+    def is_supported(self, filename):
+        return os.path.splitext(filename)[1].lower() in ('.pdf', '.docx')
 
-                # If PyMuPDF doesn't extract much text, try pdfplumber with OCR
-                if len(text.strip()) < 100:
-                    text = self.extract_text_from_pdf(file)
+    def extract_text(self, source, filename):
+        """Cleaned text of a PDF or DOCX resume given as a path or bytes."""
+        if os.path.splitext(filename)[1].lower() == '.pdf':
+            return self.parse_pdf(source)
+        return self.parse_docx(source)
 
-            return self.clean_text(text)
+    def parse_pdf(self, source):
+        try:
+            return self.clean_text("\n".join(self.extract_pdf_pages(source)))
         except Exception as e:
             logger.error(f"Error parsing PDF: {str(e)}")
             return ""
 
-    def extract_text_from_pdf(self, file):
-        text = ""
-        try:
-            with pdfplumber.open(file) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text(x_tolerance=1, y_tolerance=1)
-                    if not page_text:
-                        image = page.to_image()
-                        page_text = pytesseract.image_to_string(image.original, config='--psm 6')
-                    text += page_text + "\n"
-            return text
-        except Exception as e:
-            logger.error(f"Error extracting text from PDF with pdfplumber and OCR: {str(e)}")
-            return ""
+    def extract_pdf_pages(self, source):
+        """Text of every page, opening the PDF (a path or bytes) exactly once.
+
+        Pages with a text layer are read natively; the rest are rendered and
+        OCRed concurrently, up to the first ``max_ocr_pages`` pages.
+        """
+        if isinstance(source, (bytes, bytearray)):
+            pdf_document = fitz.open(stream=source, filetype='pdf')
+        else:
+            pdf_document = fitz.open(source)
+
+        with pdf_document, stage_timer('resume_parser', 'pdf_text'):
+            page_texts = []
+            scanned = {}
+            for page in pdf_document:
+                page_text = page.get_text()
+                if len(page_text.strip()) >= self.MIN_PAGE_TEXT:
+                    page_texts.append(page_text)
+                    continue
+                page_texts.append("")
+                if page.number < self.max_ocr_pages:
+                    scanned[page.number] = page.get_pixmap(dpi=self.OCR_DPI, colorspace=fitz.csGRAY).tobytes('png')
+                else:
+                    logger.warning(f"Not OCRing page {page.number + 1}, beyond max_ocr_pages={self.max_ocr_pages}")
+
+        # Results go back into their page slot, so page order is kept
+        if scanned:
+            with stage_timer('resume_parser', 'ocr'):
+                if len(scanned) == 1:
+                    (page_number, image_bytes), = scanned.items()
+                    page_texts[page_number] = _ocr_page(image_bytes, timeout=self.ocr_timeout)
+                else:
+                    pool = self._get_ocr_pool()
+                    futures = {page_number: pool.submit(_ocr_page, image_bytes, timeout=self.ocr_timeout)
+                               for page_number, image_bytes in scanned.items()}
+                    for page_number, future in futures.items():
+                        page_texts[page_number] = future.result()
+        return page_texts
 
-    def parse_docx(self, filepath):
+    @timed('resume_parser', 'docx_text')
+    def parse_docx(self, source):
         try:
-            doc = Document(filepath)
-            text = " ".join([paragraph.text for paragraph in doc.paragraphs])
+            doc = Document(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
             return self.clean_text(text)
         except Exception as e:
             logger.error(f"Error parsing DOCX: {str(e)}")
             return ""
 
     def clean_text(self, text):
-        text = re.sub(r'\s+', ' ', text).strip()
+        # Keep line breaks: section headers and the name are found at the start of a line
+        text = re.sub(r'[^\S\n]+', ' ', text)
+        text = re.sub(r' ?\n\s*', '\n', text).strip()
         return text
 
     def extract_information(self, text):
+        return self.extract_information_batch([text])[0]
+
+    @timed('resume_parser', 'nlp')
+    def extract_information_batch(self, texts, batch_size=32):
+        """Extract resume fields from many texts with one batched nlp.pipe pass."""
         nlp = self.load_nlp()
-        doc = nlp(text)
+        disabled = [name for name in nlp.pipe_names if name not in self.SENTENCE_COMPONENTS]
+        return [self._information_from_doc(doc) for doc in nlp.pipe(texts, batch_size=batch_size, disable=disabled)]
+
+    def _information_from_doc(self, doc):
+        text = doc.text
+        sections = self.segment(doc)
 
+        # Contact details live in the preamble; only fall back to the full text when it has none
+        contact = sections.text('contact') or text
         return {
-            "name": self.extract_name(text),
-            "email": self.extract_email(text),
-            "phone": self.extract_phone(text),
+            "name": self.extract_name(contact),
+            "email": self.extract_email(contact) or (self.extract_email(text) if contact != text else None),
+            "phone": self.extract_phone(contact) or (self.extract_phone(text) if contact != text else None),
             "skills": self.extract_skills(doc),
-            "experience": self.extract_experience(doc),
-            "education": self.extract_education(doc)
+            "experience": self.extract_experience(sections),
+            "education": self.extract_education(sections)
         }
 
+    def segment(self, doc):
+        """Per-section sentences and spans of a parsed resume."""
+        return self.segmenter.segment(doc)
+
     def extract_name(self, text):
         # Split the text into lines
         lines = text.split('\n')
@@ -153,48 +255,10 @@ class ResumeParser:
         return None
 
     def extract_skills(self, doc):
-        skill_keywords = set([
-            'python', 'java', 'c++', 'javascript', 'react', 'node.js', 'sql',
-            'machine learning', 'data analysis', 'tableau', 'power bi', 'excel',
-            'aws', 'azure', 'cloud computing', 'docker', 'kubernetes', 'git',
-            'agile', 'scrum', 'project management', 'data science', 'ai',
-            'artificial intelligence', 'nlp', 'natural language processing',
-            'data visualization', 'statistical analysis', 'r', 'scala', 'hadoop',
-            'spark', 'big data', 'data engineering', 'etl', 'data warehousing'
-        ])
-        skills = [token.text.lower() for token in doc if token.text.lower() in skill_keywords]
-        return list(set(skills))
-
-    def extract_experience(self, doc):
-        experience_keywords = ['experience', 'work history', 'employment']
-        experience_sections = []
-        current_section = []
-        for sent in doc.sents:
-            if any(keyword in sent.text.lower() for keyword in experience_keywords):
-                if current_section:
-                    experience_sections.append(' '.join(current_section))
-                current_section = [sent.text]
-            elif current_section:
-                current_section.append(sent.text)
-
-        if current_section:
-            experience_sections.append(' '.join(current_section))
-
-        return ' '.join(experience_sections)[:1000]  # Limit to 1000 characters
-
-    def extract_education(self, doc):
-        education_keywords = ['education', 'university', 'college', 'degree']
-        education_sections = []
-        current_section = []
-        for sent in doc.sents:
-            if any(keyword in sent.text.lower() for keyword in education_keywords):
-                if current_section:
-                    education_sections.append(' '.join(current_section))
-                current_section = [sent.text]
-            elif current_section:
-                current_section.append(sent.text)
-
-        if current_section:
-            education_sections.append(' '.join(current_section))
-
-        return ' '.join(education_sections)[:500]  # Limit to 500 characters
\ No newline at end of file
+        return self.skill_matcher.find(doc.text)
+
+    def extract_experience(self, sections):
+        return sections.text('experience')[:1000]  # Limit to 1000 characters
+
+    def extract_education(self, sections):
+        return sections.text('education')[:500]  # Limit to 500 characters
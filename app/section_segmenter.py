@@ -0,0 +1,76 @@
+import re
+
+# Keywords that open a section when they appear in a sentence
+DEFAULT_SECTION_HEADERS = {
+    'experience': ['experience', 'work history', 'employment'],
+    'education': ['education', 'university', 'college', 'degree'],
+    'skills': ['skills', 'technologies', 'competencies'],
+    'contact': ['contact']
+}
+
+
+class Segmentation:
+    """Sentences of a document grouped by the section they belong to."""
+
+    def __init__(self, doc, sentences):
+        self.doc = doc
+        self.sentences = sentences
+
+    def text(self, section):
+        texts = (sent.text.strip() for sent in self.sentences.get(section, []))
+        return ' '.join(text for text in texts if text)
+
+    def spans(self, section):
+        """Contiguous spaCy Spans covering the section, one per uninterrupted run of sentences."""
+        spans = []
+        start = end = None
+        for sent in self.sentences.get(section, []):
+            if sent.start != end:
+                if start is not None:
+                    spans.append(self.doc[start:end])
+                start = sent.start
+            end = sent.end
+        if start is not None:
+            spans.append(self.doc[start:end])
+        return spans
+
+
+class SectionSegmenter:
+    """Labels every sentence of a parsed resume with its section in a single pass.
+
+    A sentence or line starting with a header keyword, optionally followed
+    by a colon, opens that section and the following sentences belong to it
+    until the next header; keywords inside body text ("modern technologies",
+    "point of contact") do not. A header line in the middle of a sentence, as
+    in unpunctuated text extracted from a PDF, splits the sentence there.
+    Sentences before the first header belong to ``default_section``, which for
+    a resume is the name and contact preamble.
+    """
+
+    def __init__(self, headers=None, default_section='contact'):
+        self.headers = {section: list(keywords) for section, keywords in (headers or DEFAULT_SECTION_HEADERS).items()}
+        self.default_section = default_section
+        # One alternation of all keywords, with a named group per section, anchored to a line start
+        self.pattern = re.compile(r'^\W*(?:' + '|'.join(
+            f"(?P<{section}>{'|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))})"
+            for section, keywords in self.headers.items() if keywords
+        ) + r')(?!\w)\s*:?', re.IGNORECASE | re.MULTILINE)
+
+    def segment(self, doc):
+        sentences = {section: [] for section in self.headers}
+        sentences.setdefault(self.default_section, [])
+        section = self.default_section
+        for sent in doc.sents:
+            start = sent.start
+            for match in self.pattern.finditer(sent.text):
+                header = self._token_at(sent, sent.start_char + match.start(match.lastgroup))
+                if header > start:
+                    sentences[section].append(doc[start:header])
+                    start = header
+                section = match.lastgroup
+            sentences[section].append(doc[start:sent.end])
+        return Segmentation(doc, sentences)
+
+    @staticmethod
+    def _token_at(sent, char):
+        return next(token.i for token in sent if token.idx >= char)
@@ -0,0 +1,80 @@
+import os
+import logging
+import threading
+import spacy
+from spacy.matcher import PhraseMatcher
+from spacy.util import compile_infix_regex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SKILLS = [
+    'python', 'java', 'c++', 'javascript', 'react', 'node.js', 'sql',
+    'machine learning', 'data analysis', 'tableau', 'power bi', 'excel',
+    'aws', 'azure', 'cloud computing', 'docker', 'kubernetes', 'git',
+    'agile', 'scrum', 'project management', 'data science', 'ai',
+    'artificial intelligence', 'nlp', 'natural language processing',
+    'data visualization', 'statistical analysis', 'r', 'scala', 'hadoop',
+    'spark', 'big data', 'data engineering', 'etl', 'data warehousing'
+]
+
+
+class SkillMatcher:
+    """Finds every taxonomy skill in a text with one linear pass of a spaCy PhraseMatcher.
+
+    Skills are matched case-insensitively on token boundaries, so multi-word
+    skills such as 'machine learning' match and the cost per document does not
+    grow with the size of the taxonomy.
+    """
+
+    def __init__(self, skills=None):
+        self.nlp = spacy.blank("en")
+        # Split slash-separated lists such as "node.js/react", which would otherwise look like a URL
+        infixes = list(self.nlp.Defaults.infixes) + [r'/']
+        self.nlp.tokenizer.infix_finditer = compile_infix_regex(infixes).finditer
+        self.nlp.tokenizer.url_match = None
+        self.matcher = PhraseMatcher(self.nlp.vocab, attr='LOWER')
+        self.skills = set()
+        self.add_skills(DEFAULT_SKILLS if skills is None else skills)
+
+    def add_skills(self, skills):
+        for skill in skills:
+            skill = skill.strip().lower()
+            if skill and skill not in self.skills:
+                self.skills.add(skill)
+                self.matcher.add(skill, [self.nlp.make_doc(skill)])
+
+    def __len__(self):
+        return len(self.skills)
+
+    def find(self, text):
+        """Skills found in ``text``, de-duplicated in order of first appearance."""
+        if not text:
+            return []
+        doc = self.nlp.make_doc(text)
+        found = {}
+        for match_id, start, end in self.matcher(doc):
+            found.setdefault(self.nlp.vocab.strings[match_id], start)
+        return sorted(found, key=found.get)
+
+
+def load_skill_taxonomy(path):
+    """Read one skill per line, ignoring blank lines and '#' comments."""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+_skill_matcher = None
+_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    """Process-wide SkillMatcher built from SKILL_TAXONOMY_PATH if set, else DEFAULT_SKILLS."""
+    global _skill_matcher
+    if _skill_matcher is None:
+        with _lock:
+            if _skill_matcher is None:
+                path = os.getenv('SKILL_TAXONOMY_PATH')
+                skills = load_skill_taxonomy(path) if path else None
+                _skill_matcher = SkillMatcher(skills)
+                logger.info(f"Built skill matcher with {len(_skill_matcher)} skills")
+    return _skill_matcher
@@ -0,0 +1,110 @@
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from app.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ['name', 'email', 'phone', 'skills', 'experience', 'education']
+
+
+class ResumeTaskQueue:
+    """In-process queue that parses uploaded resumes on a worker pool.
+
+    Tasks live in the upload_tasks table, so queued work survives a restart:
+    on start every queued task, and every running task that has not been
+    updated for ``stale_after`` (its worker died), is submitted again.
+
+    The worker pool belongs to the process that started it: with
+    ``start=False`` it is created by the first start() or submit() in each
+    process, so a pre-fork server's master never hands worker threads to its
+    forked children.
+    """
+
+    def __init__(self, db_manager, resume_parser, workers=2, stale_after=timedelta(minutes=10), start=True):
+        self.db_manager = db_manager
+        self.resume_parser = resume_parser
+        self.workers = workers
+        self.stale_after = stale_after
+        self.executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if start:
+            self.start()
+
+    def start(self):
+        """Create the worker pool and requeue unfinished tasks, once per process."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='resume-worker')
+            self._pid = os.getpid()
+
+        stale_before = (datetime.utcnow() - self.stale_after).isoformat()
+        for task_id in self.db_manager.requeue_upload_tasks(stale_before):
+            self.executor.submit(self._run, task_id)
+
+    def submit(self, filename, payload=None, filepath=None, resume_id=None):
+        """Queue a resume from its uploaded bytes or from a file on disk."""
+        self.start()
+        task_id = self.db_manager.add_upload_task(filename, payload=payload, filepath=filepath, resume_id=resume_id)
+        self.executor.submit(self._run, task_id)
+        return task_id
+
+    def get_status(self, task_id):
+        return self.db_manager.get_upload_task(task_id)
+
+    @timed('task_queue', 'upload_task')
+    def _run(self, task_id):
+        if not self.db_manager.claim_upload_task(task_id):
+            return
+        task = self.db_manager.get_upload_task(task_id)
+        try:
+            data = self.db_manager.get_upload_payload(task_id)
+            if data is None:
+                with open(task['filepath'], 'rb') as f:
+                    data = f.read()
+            content_hash = self.resume_parser.content_hash(data)
+            resume_id = task['resume_id']
+
+            # Identical bytes were already parsed by this parser version: reuse that record
+            cached = self.resume_parser.cached_resume(content_hash)
+            if cached is not None and not resume_id:
+                self.db_manager.update_upload_task(task_id, status='done', progress=100, resume_id=cached['id'],
+                                                   payload=None)
+                return
+
+            if cached is not None:
+                resume_data = {field: cached[field] for field in REQUIRED_FIELDS}
+            else:
+                resume_data = self.resume_parser.parse_resume(data, task['filename'])
+                if not isinstance(resume_data, dict):
+                    self.db_manager.update_upload_task(task_id, status='failed', error='Failed to parse resume')
+                    return
+            self.db_manager.update_upload_task(task_id, progress=70)
+
+            # Ensure all required fields are present
+            for field in REQUIRED_FIELDS:
+                if field not in resume_data:
+                    resume_data[field] = '' if field != 'skills' else []
+
+            # Re-uploading into an existing resume replaces it and drops its cached match scores
+            if resume_id:
+                if self.db_manager.update_resume(resume_id, resume_data, content_hash=content_hash) is None:
+                    self.db_manager.update_upload_task(task_id, status='failed', error='Resume not found')
+                    return
+            else:
+                resume_id = self.db_manager.add_resume(resume_data, content_hash=content_hash)
+
+            self.db_manager.update_upload_task(task_id, status='done', progress=100, resume_id=resume_id, payload=None)
+        except Exception as e:
+            logger.error(f"Error processing upload task {task_id}: {str(e)}", exc_info=True)
+            self.db_manager.update_upload_task(task_id, status='failed', error=str(e))
+
+    def shutdown(self, wait=True):
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait)
@@ -0,0 +1,98 @@
+import io
+import random
+from datetime import datetime
+import fitz  # PyMuPDF
+from docx import Document
+from app.skill_matcher import DEFAULT_SKILLS
+
+TITLES = ['Software Engineer', 'Data Scientist', 'Data Engineer', 'Backend Developer', 'Frontend Developer',
+          'Machine Learning Engineer', 'DevOps Engineer', 'Business Analyst', 'Project Manager', 'Cloud Architect']
+COMPANIES = [f'{prefix} {suffix}' for prefix in ('Acme', 'Globex', 'Initech', 'Umbrella', 'Stark', 'Wayne')
+             for suffix in ('Labs', 'Systems', 'Analytics', 'Digital')]
+CITIES = ['London', 'Manchester', 'Leeds', 'Bristol', 'Edinburgh', 'Cambridge', 'Oxford', 'Birmingham']
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Robin', 'Jamie']
+LAST_NAMES = ['Smith', 'Patel', 'Nguyen', 'Garcia', 'Kowalski', 'Okafor', 'Jensen', 'Silva']
+DEGREES = ['BSc Computer Science', 'MSc Data Science', 'BEng Software Engineering', 'MSc Statistics']
+FILLER = ['Worked closely with product and design teams.', 'Improved reliability of core services.',
+          'Mentored junior colleagues and ran code reviews.', 'Delivered features in fortnightly releases.',
+          'Reduced infrastructure costs across several teams.', 'Owned the on-call rotation for the platform.']
+
+
+def make_jobs(count, seed=0):
+    """``count`` deterministic job postings shaped like AdzunaJobScraper._parse_jobs output."""
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        skills = rng.sample(DEFAULT_SKILLS, rng.randint(3, 8))
+        years = rng.randint(0, 10)
+        description = (f"We are hiring a {rng.choice(TITLES).lower()} with {years}+ years of experience in "
+                       f"{', '.join(skills)}. {' '.join(rng.sample(FILLER, 3))}")
+        salary_min = rng.randrange(30000, 90000, 5000)
+        jobs.append({
+            'id': f'bench-job-{i}',
+            'title': rng.choice(TITLES),
+            'company': rng.choice(COMPANIES),
+            'location': rng.choice(CITIES),
+            'description': description,
+            'url': f'https://example.com/jobs/{i}',
+            'salary': f"{salary_min}-{salary_min + 20000}",
+            'skills': ','.join(skills),
+            'required_years': float(years),
+            'created_at': datetime(2024, 1, 1 + i % 28)
+        })
+    return jobs
+
+
+def make_resumes(count, seed=0):
+    """``count`` deterministic parsed resumes, as ResumeParser.extract_information returns them."""
+    rng = random.Random(seed)
+    resumes = []
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        years = rng.randint(1, 15)
+        resumes.append({
+            'id': f'bench-resume-{i}',
+            'name': f'{first} {last}',
+            'email': f'{first.lower()}.{last.lower()}{i}@example.com',
+            'phone': f'07{rng.randint(100000000, 999999999)}',
+            'skills': rng.sample(DEFAULT_SKILLS, rng.randint(4, 10)),
+            'experience': [f"{years} years as a {rng.choice(TITLES).lower()} at {rng.choice(COMPANIES)}. "
+                           + ' '.join(rng.sample(FILLER, 3))],
+            'education': [f"{rng.choice(DEGREES)}, University of {rng.choice(CITIES)}"]
+        })
+    return resumes
+
+
+def resume_text(resume):
+    """Plain-text rendering of a resume, one section per header the SectionSegmenter knows."""
+    return '\n'.join([
+        resume['name'],
+        f"Contact: {resume['email']} {resume['phone']}",
+        '',
+        'Experience',
+        *resume['experience'],
+        '',
+        'Education',
+        *resume['education'],
+        '',
+        'Skills',
+        ', '.join(resume['skills'])
+    ])
+
+
+def make_pdf(text):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_textbox(fitz.Rect(50, 50, page.rect.width - 50, page.rect.height - 50), text, fontsize=11)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_docx(text):
+    doc = Document()
+    for line in text.split('\n'):
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
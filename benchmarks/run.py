@@ -0,0 +1,60 @@
+import json
+import typer
+from benchmarks.suite import DEFAULT_SIZES, run_suite, compare_results
+
+cli = typer.Typer(help="Resume Matcher benchmarks.")
+
+
+@cli.callback()
+def main():
+    """Resume Matcher benchmarks."""
+
+
+@cli.command("run")
+def run(
+    output: str = typer.Option('benchmarks/results.json', help="Where to write the JSON report"),
+    sizes: str = typer.Option(','.join(str(size) for size in DEFAULT_SIZES), help="Comma-separated job corpus sizes"),
+    documents: int = typer.Option(50, help="Synthetic PDF and DOCX resumes to parse"),
+    resumes: int = typer.Option(10, help="Resumes ranked against each job corpus"),
+    mode: str = typer.Option('full', help="Parse mode: 'fast' or 'full'"),
+    repeat: int = typer.Option(3, help="Runs per benchmark; the best is reported"),
+    seed: int = typer.Option(0, help="Seed of the synthetic corpora")
+):
+    """Run the benchmark suite and write a JSON report."""
+    report = run_suite(sizes=[int(size) for size in sizes.split(',') if size], documents=documents,
+                       resumes=resumes, mode=mode, repeat=repeat, seed=seed, progress=typer.echo)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for result in report['results']:
+        typer.echo(f"  {result['name']:<28} {result['seconds']:9.4f}s  {result['per_second']:12.1f}/s")
+    typer.echo(f"Wrote {output}")
+
+
+@cli.command("compare")
+def compare(
+    current: str = typer.Argument(..., help="Report to check"),
+    baseline: str = typer.Argument(..., help="Report to compare against"),
+    threshold: float = typer.Option(0.2, help="Allowed slowdown as a fraction of the baseline time")
+):
+    """Compare a report against a baseline; exits with code 1 on any regression."""
+    with open(current) as f:
+        current_report = json.load(f)
+    with open(baseline) as f:
+        baseline_report = json.load(f)
+
+    rows = compare_results(current_report, baseline_report, threshold)
+    for row in rows:
+        flag = 'REGRESSED' if row['regressed'] else 'ok'
+        typer.echo(f"  {row['name']:<28} {row['baseline']:9.4f}s -> {row['current']:9.4f}s  "
+                   f"x{row['ratio']:.2f}  {flag}")
+    regressions = [row['name'] for row in rows if row['regressed']]
+    if regressions:
+        typer.echo(f"{len(regressions)} benchmarks regressed by more than {threshold:.0%}: {', '.join(regressions)}",
+                   err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"No regressions over {threshold:.0%} in {len(rows)} benchmarks")
+
+
+if __name__ == "__main__":
+    cli()
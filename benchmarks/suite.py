@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+import shutil
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from app.database import DatabaseManager
+from app.job_index import JobIndex
+from app.matching_engine import MatchingEngine
+from app.nlp_registry import get_nlp
+from app.resume_parser import ResumeParser
+from app.skill_matcher import SkillMatcher
+from benchmarks.corpus import make_jobs, make_resumes, resume_text, make_pdf, make_docx
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def measure(run, setup=None, repeat=3):
+    """Time ``run(*setup())`` ``repeat`` times; setup is not timed. Returns (best, median) seconds."""
+    timings = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        run(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+def _result(name, items, timings):
+    best, median = timings
+    return {'name': name, 'items': items, 'seconds': best, 'median': median,
+            'per_second': items / best if best else 0.0}
+
+
+def bench_parsing(documents, mode, repeat):
+    """Text extraction from PDF and DOCX files, then the batched NLP pass over the texts."""
+    parser = ResumeParser(None, mode=mode, ocr_workers=1)
+    parser.load_nlp()
+    texts = [resume_text(resume) for resume in make_resumes(documents, seed=1)]
+    files = {'pdf': [make_pdf(text) for text in texts], 'docx': [make_docx(text) for text in texts]}
+    results = []
+    for kind, payloads in files.items():
+        results.append(_result(f'extract_text[{kind}]', documents, measure(
+            lambda: [parser.extract_text(data, f'resume.{kind}') for data in payloads], repeat=repeat
+        )))
+    results.append(_result('extract_information', documents, measure(
+        lambda: parser.extract_information_batch(texts), repeat=repeat
+    )))
+    parser.close()
+    return results
+
+
+def bench_skill_extraction(jobs, repeat):
+    matcher = SkillMatcher()
+    descriptions = [job['description'] for job in jobs]
+    return _result(f'skill_extraction[{len(jobs)}]', len(jobs), measure(
+        lambda: [matcher.find(description) for description in descriptions], repeat=repeat
+    ))
+
+
+def bench_ranking(jobs, resumes, mode, repeat):
+    """Building the TF-IDF job index, then ranking every job for each resume."""
+    engine = MatchingEngine(job_index=JobIndex())
+    engine.nlp = get_nlp(ResumeParser.PARSE_MODES[mode])
+    descriptions = [job['description'] for job in jobs]
+
+    def build():
+        documents = engine.preprocess_texts(descriptions)
+        # A blank pipeline has no lemmatizer, so fall back to indexing the lowercased text
+        if not any(document.strip() for document in documents):
+            documents = [description.lower() for description in descriptions]
+        engine.job_index.build([job['id'] for job in jobs], documents)
+
+    results = [_result(f'build_index[{len(jobs)}]', len(jobs), measure(build, repeat=repeat))]
+    results.append(_result(f'rank_jobs[{len(jobs)}]', len(jobs) * len(resumes), measure(
+        lambda: [engine.rank_jobs_for_resume(resume, jobs, limit=10) for resume in resumes], repeat=repeat
+    )))
+    return results
+
+
+def bench_db_writes(jobs, resumes, repeat):
+    """Bulk job upserts and resume inserts into a fresh SQLite database per run."""
+    directory = tempfile.mkdtemp(prefix='resume-matcher-bench-')
+    databases = []
+
+    def fresh_database():
+        db_manager = DatabaseManager(os.path.join(directory, f'bench-{len(databases)}.db'))
+        databases.append(db_manager)
+        return (db_manager,)
+
+    results = [
+        _result(f'add_jobs[{len(jobs)}]', len(jobs), measure(
+            lambda db_manager: db_manager.add_jobs(jobs), setup=fresh_database, repeat=repeat
+        )),
+        _result(f'add_resumes[{len(resumes)}]', len(resumes), measure(
+            lambda db_manager: db_manager.add_resumes(resumes), setup=fresh_database, repeat=repeat
+        ))
+    ]
+    for db_manager in databases:
+        db_manager.close()
+    shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes=DEFAULT_SIZES, documents=50, resumes=10, mode='full', repeat=3, seed=0, progress=None):
+    """Run every benchmark and return a JSON-serialisable report."""
+    progress = progress or (lambda message: None)
+    results = []
+
+    progress(f"Parsing {documents} PDF and DOCX resumes")
+    results.extend(bench_parsing(documents, mode, repeat))
+
+    ranked_resumes = make_resumes(resumes, seed=seed)
+    for size in sizes:
+        jobs = make_jobs(size, seed=seed)
+        progress(f"Corpus of {size} jobs")
+        results.append(bench_skill_extraction(jobs, repeat))
+        results.extend(bench_ranking(jobs, ranked_resumes, mode, repeat))
+        results.extend(bench_db_writes(jobs, make_resumes(size, seed=seed), repeat))
+
+    return {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(),
+            'commit': _git_commit(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'mode': mode,
+            'repeat': repeat,
+            'seed': seed
+        },
+        'results': results
+    }
+
+
+def compare_results(current, baseline, threshold=0.2):
+    """Compare the best times of two reports.
+
+    Returns one row per benchmark present in both; a benchmark regressed when
+    it is more than ``threshold`` (a fraction) slower than the baseline.
+    """
+    baseline_seconds = {result['name']: result['seconds'] for result in baseline['results']}
+    rows = []
+    for result in current['results']:
+        if result['name'] not in baseline_seconds:
+            continue
+        before = baseline_seconds[result['name']]
+        ratio = result['seconds'] / before if before else float('inf')
+        rows.append({'name': result['name'], 'baseline': before, 'current': result['seconds'],
+                     'ratio': ratio, 'regressed': ratio > 1 + threshold})
+    return rows
@@ -1,6 +1,31 @@
 document.addEventListener('DOMContentLoaded', function() {
     const uploadForm = document.getElementById('upload-form');
     const resultDiv = document.getElementById('result');
+    const POLL_INTERVAL = 1000;
+
+    function pollStatus(statusUrl) {
+        fetch(statusUrl)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error && data.status !== 'failed') {
+                resultDiv.innerHTML = `<p class="error">${data.error}</p>`;
+            } else if (data.status === 'done') {
+                resultDiv.innerHTML = `
+                    <p>Resume uploaded and parsed successfully!</p>
+                    <a href="/resume/${data.resume_id}">View Parsed Resume</a>
+                `;
+            } else if (data.status === 'failed') {
+                resultDiv.innerHTML = `<p class="error">${data.error || 'Failed to parse resume'}</p>`;
+            } else {
+                resultDiv.innerHTML = `<p>Processing resume... ${data.progress}%</p>`;
+                setTimeout(() => pollStatus(statusUrl), POLL_INTERVAL);
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            resultDiv.innerHTML = '<p class="error">An error occurred while processing the resume.</p>';
+        });
+    }
 
     if (uploadForm) {
         uploadForm.addEventListener('submit', function(e) {
@@ -16,11 +41,14 @@ document.addEventListener('DOMContentLoaded', function() {
             .then(data => {
                 if (data.error) {
                     resultDiv.innerHTML = `<p class="error">${data.error}</p>`;
-                } else {
+                } else if (data.status === 'done') {
                     resultDiv.innerHTML = `
-                        <p>Resume uploaded and parsed successfully!</p>
+                        <p>This resume was already parsed.</p>
                         <a href="/resume/${data.resume_id}">View Parsed Resume</a>
                     `;
+                } else {
+                    resultDiv.innerHTML = '<p>Resume uploaded, processing...</p>';
+                    pollStatus(data.status_url);
                 }
             })
             .catch(error => {
@@ -29,4 +57,4 @@ document.addEventListener('DOMContentLoaded', function() {
             });
         });
     }
-});
\ No newline at end of file
+});
@@ -0,0 +1,77 @@
+import sys
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api_cache import ResponseCache
+
+
+def test_hits_misses_and_ttl_expiry(monkeypatch):
+    cache = ResponseCache(ttl=10)
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {'results': [len(calls)]}
+
+    assert cache.get_or_fetch('k', fetch) == {'results': [1]}
+    assert cache.get_or_fetch('k', fetch) == {'results': [1]}
+    now[0] += 11
+    assert cache.get_or_fetch('k', fetch) == {'results': [2]}
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'disk_hits': 0, 'misses': 2, 'coalesced': 0}
+
+
+def test_lru_eviction_and_failed_fetches_are_not_cached():
+    cache = ResponseCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+    calls = []
+    assert cache.get_or_fetch('d', lambda: calls.append(1)) is None
+    assert cache.get_or_fetch('d', lambda: calls.append(1)) is None
+    assert len(calls) == 2
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'api_cache.db')
+    first = ResponseCache(path=path)
+    first.get_or_fetch(first.make_key('page', 'python', 1), lambda: {'results': ['job-1']})
+
+    second = ResponseCache(path=path)
+    value = second.get_or_fetch(second.make_key('page', 'python', 1), lambda: {'results': ['fetched again']})
+    assert value == {'results': ['job-1']}
+    assert second.stats()['disk_hits'] == 1
+    assert second.stats()['misses'] == 0
+    first.close()
+    second.close()
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = ResponseCache()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {'results': []}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(cache.get_or_fetch, 'k', fetch) for _ in range(8)]
+        while cache.stats()['misses'] + cache.stats()['coalesced'] < 8:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert results == [{'results': []}] * 8
+    assert cache.stats()['coalesced'] == 7
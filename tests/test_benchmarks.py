@@ -0,0 +1,32 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.resume_parser import ResumeParser
+from benchmarks.corpus import make_jobs, make_resumes, resume_text, make_pdf, make_docx
+from benchmarks.suite import compare_results
+
+
+def test_corpora_are_deterministic():
+    assert make_jobs(50, seed=3) == make_jobs(50, seed=3)
+    assert make_jobs(50, seed=3) != make_jobs(50, seed=4)
+    assert make_resumes(5, seed=1) == make_resumes(5, seed=1)
+
+
+def test_synthetic_documents_parse_back():
+    resume = make_resumes(1)[0]
+    parser = ResumeParser(None, mode='fast')
+    for name, data in [('resume.pdf', make_pdf(resume_text(resume))), ('resume.docx', make_docx(resume_text(resume)))]:
+        text = parser.extract_text(data, name)
+        assert resume['email'] in text
+        assert resume['education'][0] in text
+
+
+def test_compare_flags_slowdowns_over_threshold():
+    baseline = {'results': [{'name': 'rank_jobs[1000]', 'seconds': 1.0}, {'name': 'add_jobs[1000]', 'seconds': 2.0}]}
+    current = {'results': [{'name': 'rank_jobs[1000]', 'seconds': 1.3}, {'name': 'add_jobs[1000]', 'seconds': 2.2},
+                           {'name': 'add_jobs[10000]', 'seconds': 9.0}]}
+
+    rows = compare_results(current, baseline, threshold=0.2)
+    assert [(row['name'], row['regressed']) for row in rows] == [('rank_jobs[1000]', True), ('add_jobs[1000]', False)]
@@ -0,0 +1,106 @@
+import sys
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from docx import Document
+from typer.testing import CliRunner
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.cli import cli, bulk_import
+from sqlalchemy import text
+from app.database import DatabaseManager
+from app.job_index import JobIndex
+from app.matching_engine import MatchingEngine
+from app.resume_parser import ResumeParser
+
+
+def _docx(path, *paragraphs):
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    document.save(str(path))
+
+
+def _resume_dir(tmp_path):
+    resumes = tmp_path / 'resumes'
+    (resumes / 'nested').mkdir(parents=True)
+    _docx(resumes / 'jane.docx', "Jane Doe.", "Experience: python developer.", "Education: BSc.")
+    _docx(resumes / 'nested' / 'john.docx', "John Roe.", "Experience: sql analyst.")
+    (resumes / 'broken.pdf').write_bytes(b"not a pdf")
+    (resumes / 'notes.txt').write_text("ignored")
+    return resumes
+
+
+def test_bulk_import_directory(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'import.db'))
+    report = bulk_import(str(_resume_dir(tmp_path)), db_manager, workers=2, batch_size=1)
+
+    assert report['imported'] == 2
+    assert report['failures'] == [('broken.pdf', 'Failed to extract text from file')]
+    assert set(report['timings']) == {'read', 'extract', 'nlp', 'store'}
+    with db_manager.Session() as session:
+        skills = sorted(row[0] for row in session.execute(text("SELECT skills FROM resumes")))
+    assert skills == ['["python"]', '["sql"]']
+
+    # Importing the same files again only finds duplicates
+    report = bulk_import(str(tmp_path / 'resumes'), db_manager, workers=1)
+    assert report['imported'] == 0
+    assert report['duplicates'] == 2
+
+
+def test_bulk_import_keeps_going_after_a_failed_batch(tmp_path, monkeypatch):
+    # Workers as threads of this process, so the failing extraction below applies to them
+    monkeypatch.setattr('app.cli.ProcessPoolExecutor', ThreadPoolExecutor)
+    extract = ResumeParser.extract_information_batch
+
+    def failing_extract(self, texts, batch_size=32):
+        if any('John' in text for text in texts):
+            raise RuntimeError("boom")
+        return extract(self, texts, batch_size=batch_size)
+
+    monkeypatch.setattr(ResumeParser, 'extract_information_batch', failing_extract)
+    report = bulk_import(str(_resume_dir(tmp_path)), DatabaseManager(str(tmp_path / 'import.db')),
+                         workers=1, batch_size=1)
+
+    assert report['imported'] == 1
+    assert sorted(report['failures']) == [('broken.pdf', 'Failed to extract text from file'),
+                                          (os.path.join('nested', 'john.docx'), 'Batch failed: boom')]
+
+
+def test_import_resumes_command_reads_zip(tmp_path):
+    resumes = _resume_dir(tmp_path)
+    archive = tmp_path / 'resumes.zip'
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.write(resumes / 'jane.docx', 'batch/jane.docx')
+        zf.write(resumes / 'nested' / 'john.docx', 'batch/john.docx')
+
+    result = CliRunner().invoke(cli, ['import-resumes', str(archive), '--database', str(tmp_path / 'cli.db'),
+                                      '--workers', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'Imported 2 resumes' in result.output
+    assert 'nlp' in result.output
+
+
+def test_import_resumes_rejects_plain_file(tmp_path):
+    path = tmp_path / 'resume.docx'
+    path.write_bytes(b"plain")
+    result = CliRunner().invoke(cli, ['import-resumes', str(path), '--database', str(tmp_path / 'cli.db')])
+    assert result.exit_code == 2
+
+
+def test_rebuild_index_command(tmp_path, monkeypatch):
+    database = str(tmp_path / 'cli.db')
+    with DatabaseManager(database) as db_manager:
+        db_manager.add_jobs([{'id': 'job-1', 'title': 'Engineer', 'description': 'kubernetes platform'},
+                             {'id': 'job-2', 'title': 'Developer', 'description': 'python services'}])
+        resume_id = db_manager.add_resume({'name': 'Jane Doe', 'skills': ['python']})
+        db_manager.save_match_results(resume_id, 'v1', [{'job_id': 'job-2', 'total_score': 50.0, 'keyword_score': 100.0,
+                                                     'semantic_score': 0.0, 'experience_score': 0.0}])
+    monkeypatch.setattr(MatchingEngine, 'preprocess_texts', lambda self, texts: [text.lower() for text in texts])
+
+    result = CliRunner().invoke(cli, ['rebuild-index', '--database', database])
+    assert result.exit_code == 0, result.output
+    assert 'Indexed 2 jobs (4 terms)' in result.output
+    assert 'cleared 1 cached scores' in result.output
+    assert 'kubernetes' in JobIndex.load(str(tmp_path / 'job_index.pkl')).vectorizer.vocabulary_
@@ -9,8 +9,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.database import DatabaseManager
 
 @pytest.fixture
-def db_manager():
-    return DatabaseManager('sqlite:///test.db')
+def db_manager(tmp_path):
+    return DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
 
 def test_database(db_manager):
     # Test adding and retrieving a resume
@@ -63,5 +63,143 @@ def test_database(db_manager):
 
     print("All database tests passed!")
 
+
+def test_add_job_notifies_listeners(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'jobs.db'))
+    notified = []
+    db_manager.add_job_listener(notified.extend)
+
+    job_data = {
+        'id': 'job-1',
+        'title': 'Data Engineer',
+        'company': 'Tech Corp',
+        'location': 'London',
+        'description': 'Build pipelines in python',
+        'skills': 'python',
+        'salary': 'Not provided',
+        'url': 'https://example.com/job',
+        'created_at': datetime.datetime(2024, 1, 1)
+    }
+    db_manager.add_job(job_data)
+    db_manager.add_job(dict(job_data, title='Senior Data Engineer'))
+
+    assert [job['id'] for job in notified] == ['job-1', 'job-1']
+    assert db_manager.get_job('job-1')['title'] == 'Senior Data Engineer'
+    assert len(db_manager.get_all_jobs()) == 1
+
+
+def test_pooled_engine_uses_wal_and_closes(tmp_path):
+    with DatabaseManager(str(tmp_path / 'pooled.db')) as db_manager:
+        with db_manager.engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == 'wal'
+            assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+
+        resume_id = db_manager.add_resume({'name': 'Jane Doe', 'skills': ['python']})
+        assert db_manager.get_resume(resume_id)['skills'] == ['python']
+
+        match_id = db_manager.add_match_result({'resume_id': resume_id, 'job_id': 'job-1', 'total_score': 50.0})
+        assert [row['id'] for row in db_manager.get_match_results(resume_id=resume_id)] == [match_id]
+    assert db_manager.engine.pool.checkedout() == 0
+
+
+def test_add_jobs_bulk_upsert_counts(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'bulk.db'))
+    notified = []
+    db_manager.add_job_listener(notified.append)
+    jobs = [
+        {'id': f'job-{i}', 'title': f'Engineer {i}', 'description': 'python', 'skills': 'python'}
+        for i in range(3)
+    ]
+    assert db_manager.add_jobs(jobs) == {'inserted': 3, 'updated': 0, 'unchanged': 0}
+
+    jobs[1] = dict(jobs[1], title='Senior Engineer 1')
+    jobs.append({'id': 'job-3', 'title': 'Engineer 3', 'description': 'sql', 'skills': 'sql'})
+    assert db_manager.add_jobs(jobs) == {'inserted': 1, 'updated': 1, 'unchanged': 2}
+    assert db_manager.add_jobs(jobs) == {'inserted': 0, 'updated': 0, 'unchanged': 4}
+
+    assert [[job['id'] for job in batch] for batch in notified] == [['job-0', 'job-1', 'job-2'], ['job-1', 'job-3']]
+    assert db_manager.get_job('job-1')['title'] == 'Senior Engineer 1'
+    assert len(db_manager.get_job_ids()) == 4
+
+
+def test_skill_inverted_index_finds_candidates(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'skills.db'))
+    db_manager.add_jobs([
+        {'id': 'job-0', 'title': 'Data Engineer', 'skills': 'python,sql,spark'},
+        {'id': 'job-1', 'title': 'Frontend Developer', 'skills': 'javascript,react'},
+        {'id': 'job-2', 'title': 'Analyst', 'skills': 'SQL, excel'},
+    ])
+    resume_id = db_manager.add_resume({'name': 'Jane Doe', 'skills': ['Python', 'sql']})
+
+    assert sorted(db_manager.get_candidate_job_ids(resume_id)) == ['job-0', 'job-2']
+    assert db_manager.get_candidate_job_ids(resume_id, min_shared=2) == ['job-0']
+    assert db_manager.get_candidate_resume_ids('job-2') == [resume_id]
+
+    # Postings follow updates on both sides
+    db_manager.add_jobs([{'id': 'job-1', 'title': 'Frontend Developer', 'skills': 'javascript,react,python'}])
+    db_manager.update_resume(resume_id, {'name': 'Jane Doe', 'skills': ['python', 'react']})
+    assert sorted(db_manager.get_candidate_job_ids(resume_id, min_shared=2)) == ['job-1']
+    assert db_manager.get_candidate_resume_ids('job-2') == []
+
+
+def test_skill_inverted_index_is_backfilled(tmp_path):
+    path = str(tmp_path / 'backfill.db')
+    db_manager = DatabaseManager(path)
+    db_manager.add_jobs([{'id': 'job-0', 'title': 'Data Engineer', 'skills': 'python,sql'}])
+    resume_id = db_manager.add_resume({'name': 'Jane Doe', 'skills': ['python']})
+    with db_manager.engine.begin() as connection:
+        for table in ('job_skills', 'resume_skills', 'skills'):
+            connection.exec_driver_sql(f"DROP TABLE {table}")
+    db_manager.close()
+
+    assert DatabaseManager(path).get_candidate_job_ids(resume_id) == ['job-0']
+
+
+def test_required_years_is_derived_when_not_given(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'required_years.db'))
+    db_manager.add_jobs([
+        {'id': 'job-0', 'title': 'Data Engineer', 'description': 'You bring 3+ years of experience with Spark.'},
+        {'id': 'job-1', 'title': 'Analyst', 'description': '5 years of experience', 'required_years': 2.0},
+    ])
+    db_manager.add_job({'id': 'job-2', 'title': 'Intern', 'description': 'No experience needed.'})
+
+    assert {job['id']: job['required_years'] for job in db_manager.get_jobs(['job-0', 'job-1', 'job-2'])} == {
+        'job-0': 3.0, 'job-1': 2.0, 'job-2': 0.0
+    }
+
+
+def test_required_years_is_backfilled(tmp_path):
+    path = str(tmp_path / 'required_years.db')
+    db_manager = DatabaseManager(path)
+    db_manager.add_jobs([{'id': 'job-0', 'title': 'Data Engineer', 'skills': 'python,sql',
+                          'description': 'You bring 3+ years of experience with Spark.'}])
+    with db_manager.engine.begin() as connection:
+        connection.exec_driver_sql("ALTER TABLE jobs DROP COLUMN required_years")
+    db_manager.close()
+
+    with DatabaseManager(path).engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT required_years FROM jobs").scalar() == 3.0
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork")
+def test_forked_child_opens_its_own_connections(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'fork.db'))
+    db_manager.add_jobs([{'id': 'job-0', 'title': 'Data Engineer', 'skills': 'python'}])
+    assert db_manager.engine.pool.checkedin() > 0
+
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            if db_manager.engine.pool.checkedin() == 0 and db_manager.get_job_ids() == ['job-0']:
+                code = 0
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert db_manager.get_job_ids() == ['job-0']
+
+
 if __name__ == "__main__":
-    pytest.main([__file__])
\ No newline at end of file
+    pytest.main([__file__])
@@ -6,9 +6,9 @@ from app.resume_parser import ResumeParser
 import unittest.mock
 
 @pytest.fixture
-def client():
-    app = create_app()
-    app.config['TESTING'] = True
+def client(tmp_path):
+    # The database, job index and API cache all default to the database's directory
+    app = create_app({'DATABASE_PATH': str(tmp_path / 'resume_matcher.db'), 'TESTING': True})
     with app.test_client() as client:
         yield client
 
@@ -26,10 +26,10 @@ def test_pdf_upload(client):
             'file': (io.BytesIO(b"%PDF-1.5 fake pdf content"), 'resume.pdf')
         }
         response = client.post('/upload', data=data, content_type='multipart/form-data')
-        assert response.status_code == 200
+        assert response.status_code == 202
         json_data = json.loads(response.data)
-        assert 'name' in json_data
-        assert 'skills' in json_data
+        assert 'job_id' in json_data
+        assert 'status_url' in json_data
 
 def test_docx_upload(client):
     with unittest.mock.patch.object(ResumeParser, 'parse_resume') as mock_parse:
@@ -45,10 +45,10 @@ def test_docx_upload(client):
             'file': (io.BytesIO(b"PK fake docx content"), 'resume.docx')
         }
         response = client.post('/upload', data=data, content_type='multipart/form-data')
-        assert response.status_code == 200
+        assert response.status_code == 202
         json_data = json.loads(response.data)
-        assert 'name' in json_data
-        assert 'skills' in json_data
+        assert 'job_id' in json_data
+        assert 'status_url' in json_data
 
 def test_invalid_file_upload(client):
     data = {
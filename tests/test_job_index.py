@@ -0,0 +1,108 @@
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.job_index import JobIndex
+
+JOB_IDS = ['job-1', 'job-2', 'job-3']
+
+
+@pytest.fixture
+def job_index(tmp_path):
+    index = JobIndex(str(tmp_path / 'job_index.pkl'))
+    index.build(
+        ['job-1', 'job-2', 'job-3'],
+        [
+            'data scientist python machine learning',
+            'frontend engineer javascript react',
+            'python backend engineer sql',
+        ]
+    )
+    return index
+
+
+def test_similarities_rank_matching_job_first(job_index):
+    similarities = job_index.similarities_to(JOB_IDS, 'python machine learning')
+    assert len(similarities) == 3
+    assert similarities.argmax() == 0
+    assert similarities[1] == 0
+
+
+def test_save_and_load_roundtrip(job_index):
+    job_index.save()
+    loaded = JobIndex.load(job_index.path)
+    assert loaded.is_built
+    assert loaded.job_ids == job_index.job_ids
+    assert 'job-3' in loaded
+    assert list(loaded.similarities_to(JOB_IDS, 'react')) == list(job_index.similarities_to(JOB_IDS, 'react'))
+
+
+def test_load_missing_file_returns_empty_index(tmp_path):
+    index = JobIndex.load(str(tmp_path / 'missing.pkl'))
+    assert not index.is_built
+    assert len(index) == 0
+
+
+def test_upsert_tombstones_replaced_rows(job_index):
+    job_index.maintenance_delay = 60
+    job_index.upsert(['job-2', 'job-4'], ['python machine learning', 'python sql'])
+    assert len(job_index) == 4
+    assert job_index.positions['job-2'] == 3
+    assert job_index.tombstones == {1}
+
+    # The replaced frontend row no longer answers for job-2
+    assert list(job_index.similarities_to(['job-2', 'job-4'], 'react')) == [0, 0]
+
+
+def test_compaction_drops_tombstones(job_index):
+    job_index.maintenance_delay = 0
+    job_index.compaction_threshold = 0.1
+    job_index.upsert(['job-1'], ['python machine learning engineer'])
+    job_index.wait_for_maintenance(timeout=5)
+
+    assert not job_index.tombstones
+    assert job_index.job_ids == ['job-2', 'job-3', 'job-1']
+    assert job_index.matrix.shape[0] == 3
+    assert job_index.similarities_to(['job-2', 'job-3', 'job-1'], 'machine learning').argmax() == 2
+
+    reloaded = JobIndex.load(job_index.path)
+    assert reloaded.job_ids == job_index.job_ids
+
+
+def test_upsert_on_unbuilt_index_is_noop(tmp_path):
+    index = JobIndex(str(tmp_path / 'job_index.pkl'))
+    assert index.upsert(['job-1'], ['python']) == 0
+    assert len(index) == 0
+
+
+def test_unseen_terms_trigger_a_refit(tmp_path):
+    index = JobIndex(str(tmp_path / 'job_index.pkl'), maintenance_delay=0)
+    # Built lazily over an almost empty jobs table
+    index.build(['job-1'], ['python developer'])
+    build_id = index.build_id
+    assert index.similarities_to(['job-1'], 'kubernetes')[0] == 0
+
+    index.upsert(['job-2', 'job-3'], ['kubernetes platform engineer', 'react frontend developer'])
+    index.wait_for_maintenance(timeout=5)
+
+    assert index.build_id != build_id
+    assert 'kubernetes' in index.vectorizer.vocabulary_
+    assert index.appended_rows == 0 and index.unseen_term_rows == 0
+    scores = index.similarities_to(['job-3', 'job-2', 'job-1'], 'kubernetes')
+    assert scores[1] > 0 and scores[0] == 0 and scores[2] == 0
+
+
+def test_similarities_to_follows_compaction(job_index):
+    job_index.maintenance_delay = 60
+    job_index.upsert(['job-1'], ['python machine learning engineer'])
+    before = job_index.similarities_to(['job-3', 'job-1', 'job-9'], 'python machine learning',
+                                       {'job-9': 'machine learning'})
+    job_index.compact()
+    after = job_index.similarities_to(['job-3', 'job-1', 'job-9'], 'python machine learning',
+                                      {'job-9': 'machine learning'})
+
+    assert job_index.job_ids == ['job-2', 'job-3', 'job-1']
+    assert before.argmax() == after.argmax() == 1
+    assert after[2] > 0
@@ -1,10 +1,17 @@
 import sys
 import os
+import json
+import re
+import threading
 import pytest
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.job_scraper import AdzunaJobScraper
+from app.database import DatabaseManager
+from app.api_cache import ResponseCache
 
 @pytest.fixture
 def scraper():
@@ -39,6 +46,129 @@ def test_job_scraper(scraper):
     assert len(summary['locations']) > 0, "Should have at least one location"
     assert len(summary['top_skills']) > 0, "Should have at least one top skill"
 
+
+class StubAdzunaHandler(BaseHTTPRequestHandler):
+    """Serves ``total_jobs`` fake postings and rate-limits the first request for page 2."""
+    total_jobs = 5
+    requests = []
+    rate_limited = set()
+
+    def do_GET(self):
+        page = int(re.search(r'/gb/search/(\d+)', self.path).group(1))
+        per_page = int(re.search(r'results_per_page=(\d+)', self.path).group(1))
+        self.requests.append(page)
+        if page == 2 and page not in self.rate_limited:
+            self.rate_limited.add(page)
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+
+        first = (page - 1) * per_page
+        results = [{
+            'id': f'job-{i}',
+            'title': f'Python Developer {i}',
+            'company': {'display_name': f'Company {i % 2}'},
+            'location': {'display_name': 'London'},
+            'description': 'Python and SQL developer',
+            'redirect_url': f'https://example.com/{i}',
+            'created': '2024-01-01T00:00:00Z'
+        } for i in range(first, min(first + per_page, self.total_jobs))]
+        body = json.dumps({'results': results}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubAdzunaHandler.requests = []
+    StubAdzunaHandler.rate_limited = set()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubAdzunaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_concurrent_scrape_against_stub_server(stub_server, tmp_path):
+    stub_scraper = AdzunaJobScraper(
+        DatabaseManager(str(tmp_path / 'jobs.db')), base_url=stub_server, max_workers=2, backoff_factor=0
+    )
+    jobs = stub_scraper.scrape_jobs("python", "London", num_pages=10, results_per_page=2)
+
+    # Page 3 is short, so nothing after it is kept and at most max_workers pages were in flight past it
+    assert [job['id'] for job in jobs] == [f'job-{i}' for i in range(5)]
+    assert StubAdzunaHandler.requests.count(2) == 2
+    assert max(StubAdzunaHandler.requests) <= 4
+    assert len(stub_scraper.db_manager.get_job_ids()) == 5
+
+
+
+def test_iter_jobs_streams_and_stores_page_by_page(stub_server, tmp_path):
+    stub_scraper = AdzunaJobScraper(
+        DatabaseManager(str(tmp_path / 'jobs.db')), base_url=stub_server, max_workers=1, backoff_factor=0
+    )
+    stream = stub_scraper.iter_jobs("python", "London", num_pages=10, results_per_page=2)
+
+    first = next(stream)
+    assert first['id'] == 'job-0'
+    # The first page is persisted before its jobs are handed out
+    assert stub_scraper.db_manager.get_job_ids() == ['job-0', 'job-1']
+
+    summary = stub_scraper.get_job_summary(stream)
+    assert summary['total_jobs'] == 4
+    assert summary['unique_companies'] == 2
+    assert summary['top_skills'] == ['python', 'sql']
+    assert len(stub_scraper.db_manager.get_job_ids()) == 5
+
+
+@pytest.mark.parametrize('description, years', [
+    ('5+ years of Python experience', 5.0),
+    ('2-4 yrs experience with SQL', 2.0),
+    ('3 to 5 years of relevant experience', 3.0),
+    ('Experience: 4 years building data pipelines', 4.0),
+    ('Looking for 5+ years of Python', 0.0),
+    ('Founded 30 years ago, 20 years of growth ahead', 0.0),
+    ('Founded in 2019, years of growth ahead', 0.0),
+    ('No experience required', 0.0),
+    ('We have 20 years of growth. 3 years experience needed.', 3.0),
+])
+def test_extract_required_years(description, years):
+    assert AdzunaJobScraper(skill_matcher=object())._extract_required_years(description) == years
+
+
+def test_repeated_searches_are_served_from_the_cache(stub_server, tmp_path):
+    cache = ResponseCache(path=str(tmp_path / 'api_cache.db'))
+    stub_scraper = AdzunaJobScraper(
+        DatabaseManager(str(tmp_path / 'jobs.db')), base_url=stub_server, max_workers=1, backoff_factor=0,
+        cache=cache
+    )
+    first = stub_scraper.scrape_jobs("python", "London", num_pages=1, results_per_page=2)
+    requests_made = len(StubAdzunaHandler.requests)
+    again = stub_scraper.scrape_jobs("  Python ", "london", num_pages=1, results_per_page=2)
+
+    assert [job['id'] for job in again] == [job['id'] for job in first]
+    assert len(StubAdzunaHandler.requests) == requests_made
+    assert cache.stats()['hits'] == 2  # the response and its parsed jobs
+
+
+def test_retry_after_is_capped_at_max_backoff():
+    stub_scraper = AdzunaJobScraper(skill_matcher=object(), max_backoff=5)
+    response = requests.Response()
+    response.headers['Retry-After'] = '3600'
+    assert stub_scraper._retry_delay(response, 0) == 5
+    response.headers['Retry-After'] = '2'
+    assert stub_scraper._retry_delay(response, 0) == 2
+    assert stub_scraper._retry_delay(None, 10) == 5
+
+
 if __name__ == "__main__":
     scraper = AdzunaJobScraper()
-    test_job_scraper(scraper)
\ No newline at end of file
+    test_job_scraper(scraper)
@@ -6,9 +6,9 @@ from app.resume_parser import ResumeParser
 import unittest.mock
 
 @pytest.fixture
-def client():
-    app = create_app()
-    app.config['TESTING'] = True
+def client(tmp_path):
+    # The database, job index and API cache all default to the database's directory
+    app = create_app({'DATABASE_PATH': str(tmp_path / 'resume_matcher.db'), 'TESTING': True})
     with app.test_client() as client:
         yield client
 
@@ -31,10 +31,10 @@ def test_file_upload(client):
             'file': (io.BytesIO(b"%PDF-1.5 test file content"), 'test.pdf')
         }
         response = client.post('/upload', data=data, content_type='multipart/form-data')
-        assert response.status_code == 200
+        assert response.status_code == 202
         json_data = json.loads(response.data)
-        assert 'name' in json_data
-        assert 'skills' in json_data
+        assert 'job_id' in json_data
+        assert json_data['status'] == 'queued'
 
 def test_no_file_upload(client):
     response = client.post('/upload', data={}, content_type='multipart/form-data')
@@ -51,4 +51,58 @@ def test_invalid_file_type(client):
     assert response.status_code == 200
     json_data = json.loads(response.data)
     assert 'error' in json_data
-    assert json_data['error'] == 'File type not allowed'
\ No newline at end of file
+    assert json_data['error'] == 'File type not allowed'
+
+def test_job_search_is_served_locally_when_fresh(tmp_path, monkeypatch):
+    from app.job_scraper import AdzunaJobScraper
+    app = create_app({'DATABASE_PATH': str(tmp_path / 'search.db'), 'TESTING': True})
+    app.db_manager.add_jobs([
+        {'id': f'job-{i}', 'title': f'Python Developer {i}', 'company': 'Acme', 'location': 'London',
+         'description': 'python services'}
+        for i in range(3)
+    ])
+    live_calls = []
+
+    def fake_scrape(self, query, location, num_pages=1, results_per_page=10):
+        live_calls.append(query)
+        if query == 'cobol':
+            return []
+        jobs = [{'id': 'live-0', 'title': 'Python Engineer', 'company': 'Live Co', 'location': 'London',
+                 'description': 'python'}]
+        self.db_manager.add_jobs(jobs)
+        return jobs
+
+    monkeypatch.setattr(AdzunaJobScraper, 'scrape_jobs', fake_scrape)
+    with app.test_client() as client:
+        response = client.get('/api/jobs/search?query=python&location=london&results_per_page=2')
+        data = json.loads(response.data)
+        assert data['source'] == 'local'
+        assert len(data['jobs']) == 2
+        assert live_calls == []
+
+        # Second page through the keyset cursor
+        response = client.get(f"/api/jobs/search?query=python&location=london&results_per_page=2"
+                              f"&cursor={data['next_cursor']}")
+        data = json.loads(response.data)
+        assert len(data['jobs']) == 1
+        assert data['next_cursor'] is None
+
+        # Too few local results falls back to the live scraper once
+        response = client.get('/api/jobs/search?query=python&location=london&results_per_page=5')
+        data = json.loads(response.data)
+        assert data['source'] == 'live'
+        assert 'live-0' in [job['id'] for job in data['jobs']]
+        assert live_calls == ['python']
+
+        # Still too few, but just refreshed
+        response = client.get('/api/jobs/search?query=python&location=london&results_per_page=5')
+        assert json.loads(response.data)['source'] == 'local'
+        assert live_calls == ['python']
+
+        # An empty live result counts as a refresh too
+        for expected_source in ('live', 'local'):
+            response = client.get('/api/jobs/search?query=cobol&location=london')
+            data = json.loads(response.data)
+            assert data['source'] == expected_source
+            assert data['jobs'] == []
+        assert live_calls == ['python', 'cobol']
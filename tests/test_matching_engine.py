@@ -1,8 +1,15 @@
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import spacy
+import pytest
+from spacy.language import Language
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.matching_engine import MatchingEngine
+from app.database import DatabaseManager
+from app.job_index import JobIndex
 
 def test_matching_engine():
     engine = MatchingEngine()
@@ -39,5 +46,257 @@ def test_matching_engine():
         print(f"Semantic Score: {match_result['semantic_score']}%")
         print(f"Experience Score: {match_result['experience_score']}%")
 
+
+@Language.component("lowercase_lemmatizer")
+def lowercase_lemmatizer(doc):
+    for token in doc:
+        token.lemma_ = token.lower_
+    return doc
+
+
+def blank_engine(**kwargs):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    nlp.add_pipe("lowercase_lemmatizer", name="lemmatizer")
+    ruler = nlp.add_pipe("entity_ruler", name="ner")
+    ruler.add_patterns([{"label": "DATE", "pattern": [{"LIKE_NUM": True}, {"LOWER": {"IN": ["year", "years"]}}]}])
+    engine = MatchingEngine(batch_size=8, **kwargs)
+    engine.nlp = nlp
+    return engine
+
+
+def test_pipe_disables_unneeded_components():
+    engine = blank_engine()
+    assert engine._disabled_components(engine.nlp, engine.LEMMA_COMPONENTS) == ['sentencizer', 'ner']
+    assert engine._disabled_components(engine.nlp, engine.NER_COMPONENTS) == ['sentencizer', 'lemmatizer']
+
+
+def test_batched_preprocessing_and_years():
+    engine = blank_engine()
+    assert engine.preprocess_texts(["Python, and SQL!", "Machine Learning"]) == ["python sql", "machine learning"]
+    assert engine.extract_years_of_experience_batch(["5 years of python", "", "no dates"]) == [5, 0, 0]
+
+
+def test_years_without_a_leading_number():
+    engine = blank_engine()
+    engine.nlp.get_pipe("ner").add_patterns([
+        {"label": "DATE", "pattern": [{"LOWER": "the"}, {"LOWER": "last"}, {"LIKE_NUM": True}, {"LOWER": "years"}]}
+    ])
+    assert engine.extract_years_of_experience_batch(
+        ["five years of python", "sql for the last 3 years", "five years, then 2 years of go"]
+    ) == [0, 3, 2]
+
+
+def test_rank_jobs_batches_one_pass_per_task():
+    engine = blank_engine()
+    calls = []
+    original_pipe = engine.pipe
+
+    def counting_pipe(texts, components):
+        calls.append(components)
+        return original_pipe(texts, components)
+
+    engine.pipe = counting_pipe
+    resume = {
+        'skills': ['python', 'sql'],
+        'experience': ['5 years of python development'],
+        'education': ['BSc Computer Science']
+    }
+    jobs = [
+        {'description': 'python developer', 'skills': ['python'], 'required_experience': '3 years'},
+        {'description': 'react developer', 'skills': ['react'], 'required_experience': ''},
+    ]
+    ranked = engine.rank_jobs_for_resume(resume, jobs)
+
+    assert calls == [engine.LEMMA_COMPONENTS, engine.NER_COMPONENTS]
+    assert ranked[0][0]['description'] == 'python developer'
+    assert ranked[0][1]['experience_score'] == 100.0
+
+
+
+def test_get_top_matches_selects_and_caches_scores(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'matches.db'))
+    engine = blank_engine(job_index=JobIndex(str(tmp_path / 'job_index.pkl')), db_manager=db_manager)
+    db_manager.add_job_listener(engine.index_jobs)
+    for i, (description, skills) in enumerate([
+        ('python machine learning engineer', 'python,machine learning'),
+        ('react frontend developer', 'javascript,react'),
+        ('python sql data engineer', 'python,sql'),
+    ]):
+        db_manager.add_job({'id': f'job-{i}', 'title': f'Job {i}', 'description': description, 'skills': skills})
+    resume_id = db_manager.add_resume({
+        'name': 'Jane Doe',
+        'skills': ['python', 'sql'],
+        'experience': '5 years of python and sql data pipelines',
+        'education': 'BSc Computer Science'
+    })
+
+    matches = engine.get_top_matches(resume_id, limit=2)
+    assert [job['id'] for job, _ in matches] == ['job-2', 'job-0']
+    stored = db_manager.get_match_results(resume_id=resume_id)
+    assert len(stored) == 3
+    assert {row['config_version'] for row in stored} == {engine.scoring_version}
+
+    # Repeat views are served from match_results without rescoring or loading every job and score
+    scored = []
+    score_jobs = engine.score_jobs
+    engine.score_jobs = lambda resume, jobs: scored.extend(job['id'] for job in jobs) or score_jobs(resume, jobs)
+    get_job_ids, get_match_results = db_manager.get_job_ids, db_manager.get_match_results
+    db_manager.get_job_ids = db_manager.get_match_results = None
+    cached = engine.get_top_matches(resume_id, limit=2)
+    db_manager.get_job_ids, db_manager.get_match_results = get_job_ids, get_match_results
+    assert [job['id'] for job, _ in cached] == ['job-2', 'job-0']
+    assert cached[0][1]['total_score'] == matches[0][1]['total_score']
+    assert scored == []
+
+    # Only the new job and the job whose description changed are rescored
+    db_manager.add_job({'id': 'job-1', 'title': 'Job 1 (renamed)', 'description': 'react frontend developer',
+                        'skills': 'javascript,react'})
+    db_manager.add_job({'id': 'job-0', 'title': 'Job 0', 'description': 'java backend engineer', 'skills': 'java'})
+    db_manager.add_job({'id': 'job-3', 'title': 'Job 3', 'description': 'python sql engineer', 'skills': 'python,sql'})
+    refreshed = engine.get_top_matches(resume_id, limit=2)
+    assert sorted(scored) == ['job-0', 'job-3']
+    assert [job['id'] for job, _ in refreshed] == ['job-2', 'job-3']
+
+    # A background refit of the index keeps the cached scores
+    scoring_version = engine.scoring_version
+    engine.job_index.compact()
+    scored.clear()
+    assert engine.scoring_version == scoring_version
+    assert [job['id'] for job, _ in engine.get_top_matches(resume_id, limit=2)] == ['job-2', 'job-3']
+    assert scored == []
+
+    # Re-uploading the resume drops its cached scores
+    db_manager.update_resume(resume_id, {'skills': ['react'], 'experience': 'react', 'education': ''})
+    assert db_manager.get_match_results(resume_id=resume_id) == []
+
+    assert engine.get_top_matches('missing', limit=2) == []
+
+
+def test_vectorized_scores_match_pairwise_scores():
+    engine = MatchingEngine()
+    resumes = [['python', 'sql'], ['react'], []]
+    jobs = [['python'], ['python', 'sql', 'docker'], [], ['react', 'python']]
+
+    keyword_scores = engine.keyword_score_matrix(resumes, jobs)
+    assert keyword_scores.shape == (3, 4)
+    for r, resume_skills in enumerate(resumes):
+        for j, job_skills in enumerate(jobs):
+            assert keyword_scores[r, j] == pytest.approx(engine.calculate_keyword_score(resume_skills, job_skills))
+
+    experience_scores = engine.experience_score_matrix([0, 4, 10], [0, 2, 8])
+    for r, resume_years in enumerate([0, 4, 10]):
+        for j, required_years in enumerate([0, 2, 8]):
+            assert experience_scores[r, j] == pytest.approx(engine._experience_score(resume_years, required_years))
+
+
+def test_score_jobs_uses_stored_required_years():
+    engine = blank_engine()
+    resume = {'skills': ['python'], 'experience': ['4 years of python'], 'education': []}
+    jobs = [
+        {'description': 'python developer', 'skills': 'python,sql', 'required_years': 8.0},
+        {'description': 'python developer', 'skills': 'python', 'required_years': 0.0},
+    ]
+    scores = engine.score_jobs(resume, jobs)
+
+    assert list(scores['keyword_score']) == [50.0, 100.0]
+    assert list(scores['experience_score']) == [50.0, 100.0]
+
+
+def test_match_all_keeps_top_k_per_resume_and_job(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'all_pairs.db'))
+    engine = blank_engine(job_index=JobIndex(str(tmp_path / 'job_index.pkl')), db_manager=db_manager)
+    db_manager.add_job_listener(engine.index_jobs)
+    db_manager.add_jobs([
+        {'id': 'job-0', 'description': 'python machine learning engineer', 'skills': 'python,machine learning',
+         'required_years': 3.0},
+        {'id': 'job-1', 'description': 'react frontend developer', 'skills': 'javascript,react', 'required_years': 2.0},
+        {'id': 'job-2', 'description': 'python sql data engineer', 'skills': 'python,sql', 'required_years': 6.0},
+        {'id': 'job-3', 'description': 'java backend developer', 'skills': 'java,sql', 'required_years': 4.0},
+        {'id': 'job-4', 'description': 'data analyst with excel and sql', 'skills': 'excel,sql', 'required_years': 1.0},
+    ])
+    resumes = [
+        ('python machine learning research', ['python', 'machine learning'], '2 years'),
+        ('react and javascript web apps', ['javascript', 'react'], '4 years'),
+        ('sql reporting in excel', ['excel', 'sql'], '1 years'),
+        ('java services with sql', ['java', 'sql', 'python'], '8 years'),
+        ('python data pipelines', ['python', 'sql'], '5 years'),
+    ]
+    for experience, skills, years in resumes:
+        db_manager.add_resume({'name': experience, 'skills': skills, 'experience': f'{years} of {experience}',
+                               'education': ''})
+
+    report = engine.match_all(k=2, resume_block_size=2, job_block_size=3)
+    assert (report['resumes'], report['jobs']) == (5, 5)
+
+    # Brute force over every pair with the single-resume scorer
+    jobs = db_manager.get_all_jobs()
+    totals = {}
+    for resume_block in db_manager.iter_resumes():
+        for resume in resume_block:
+            scores = engine.score_jobs(resume, jobs)
+            for job, total in zip(jobs, scores['total_score']):
+                totals[resume['id'], job['id']] = round(float(total), 2)
+
+    stored = {(row['resume_id'], row['job_id']): row['total_score']
+              for row in db_manager.get_match_results(config_version=engine.scoring_version)}
+    for (resume_id, job_id), total in stored.items():
+        assert total == totals[resume_id, job_id]
+    for resume_id in {resume_id for resume_id, _ in totals}:
+        best = sorted((total for (r, _), total in totals.items() if r == resume_id), reverse=True)[:2]
+        assert sorted((total for (r, _), total in stored.items() if r == resume_id), reverse=True)[:2] == best
+    for job in jobs:
+        best = sorted((total for (_, j), total in totals.items() if j == job['id']), reverse=True)[:2]
+        candidates = engine.get_top_candidates(job['id'], limit=2)
+        assert [row['total_score'] for _, row in candidates] == best
+
+
+def test_get_top_matches_prefilters_on_shared_skills(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'prefilter.db'))
+    engine = blank_engine(job_index=JobIndex(str(tmp_path / 'job_index.pkl')), db_manager=db_manager,
+                          min_shared_skills=1)
+    db_manager.add_jobs([
+        {'id': 'job-0', 'title': 'Data Engineer', 'description': 'python sql pipelines', 'skills': 'python,sql'},
+        {'id': 'job-1', 'title': 'Frontend', 'description': 'react web apps', 'skills': 'javascript,react'},
+        {'id': 'job-2', 'title': 'Analyst', 'description': 'excel reporting', 'skills': 'excel'},
+    ])
+    resume_id = db_manager.add_resume({'name': 'Jane Doe', 'skills': ['python'],
+                                       'experience': '3 years of python', 'education': ''})
+    scored = []
+    original_score_jobs = engine.score_jobs
+    engine.score_jobs = lambda resume, jobs: scored.extend(job['id'] for job in jobs) or original_score_jobs(resume, jobs)
+
+    matches = engine.get_top_matches(resume_id)
+    assert [job['id'] for job, _ in matches] == ['job-0']
+    assert scored == ['job-0']
+
+    # Without skills there is nothing to prefilter on
+    no_skills_id = db_manager.add_resume({'name': 'John Roe', 'skills': [], 'experience': '', 'education': ''})
+    assert len(engine.get_top_matches(no_skills_id)) == 3
+
+
+def test_concurrent_first_views_build_the_index_once(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'first_view.db'))
+    engine = blank_engine(job_index=JobIndex(str(tmp_path / 'job_index.pkl')), db_manager=db_manager)
+    db_manager.add_jobs([{'id': f'job-{i}', 'title': 'Data Engineer', 'description': 'python sql pipelines',
+                          'skills': 'python,sql'} for i in range(3)])
+    resume_id = db_manager.add_resume({'name': 'Jane Doe', 'skills': ['python'],
+                                       'experience': '3 years of python', 'education': ''})
+    builds = []
+    build_job_index = engine.build_job_index
+
+    def slow_build(jobs):
+        builds.append(len(jobs))
+        time.sleep(0.1)
+        return build_job_index(jobs)
+
+    engine.build_job_index = slow_build
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        views = list(executor.map(lambda _: engine.get_top_matches(resume_id, limit=3), range(4)))
+
+    assert builds == [3]
+    assert all(len(matches) == 3 for matches in views)
+
+
 if __name__ == "__main__":
-    test_matching_engine()
\ No newline at end of file
+    test_matching_engine()
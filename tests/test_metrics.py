@@ -0,0 +1,56 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.metrics import Histogram, STAGE_SECONDS, timed
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram('test_seconds', 'Test histogram.', ('stage',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, 'parse')
+
+    assert histogram.render() == [
+        '# HELP test_seconds Test histogram.',
+        '# TYPE test_seconds histogram',
+        'test_seconds_bucket{stage="parse",le="0.1"} 1',
+        'test_seconds_bucket{stage="parse",le="1.0"} 2',
+        'test_seconds_bucket{stage="parse",le="+Inf"} 3',
+        'test_seconds_sum{stage="parse"} 5.55',
+        'test_seconds_count{stage="parse"} 3',
+    ]
+
+
+def test_timed_records_calls_that_raise():
+    @timed('tests', 'failing_stage')
+    def fail():
+        raise ValueError("boom")
+
+    count, _ = STAGE_SECONDS.snapshot('tests', 'failing_stage')
+    try:
+        fail()
+    except ValueError:
+        pass
+    assert STAGE_SECONDS.snapshot('tests', 'failing_stage')[0] == count + 1
+
+
+def test_metrics_endpoint_and_request_profiling(tmp_path):
+    app = create_app({'DATABASE_PATH': str(tmp_path / 'metrics.db'), 'TESTING': True, 'PROFILE_REQUESTS': True,
+                      'PROFILE_MIN_SECONDS': 0, 'PROFILE_DIR': str(tmp_path / 'profiles')})
+    app.db_manager.add_jobs([{'id': 'job-1', 'title': 'Python Developer', 'description': 'python'}])
+    with app.test_client() as client:
+        assert client.get('/health').status_code == 200
+        assert not (tmp_path / 'profiles').exists()
+        client.get('/health', headers={'X-Profile': '1'})
+        response = client.get('/metrics')
+
+    body = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert 'resume_matcher_stage_seconds_count{component="database",stage="add_jobs"}' in body
+    assert 'resume_matcher_request_seconds_count{endpoint="main.health_check",method="GET",status="200"}' in body
+    assert 'resume_matcher_api_cache_hits_total 0' in body
+    assert [path.suffix for path in (tmp_path / 'profiles').iterdir()] == ['.prof']
+    app.resume_queue.shutdown()
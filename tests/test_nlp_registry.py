@@ -0,0 +1,51 @@
+import sys
+import os
+import threading
+import spacy
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import nlp_registry
+from app.matching_engine import MatchingEngine
+from app.resume_parser import ResumeParser
+
+
+@pytest.fixture
+def load_calls(monkeypatch):
+    calls = []
+
+    def fake_load(name):
+        calls.append(name)
+        return spacy.blank("en")
+
+    nlp_registry.clear()
+    monkeypatch.setattr(nlp_registry.spacy, "load", fake_load)
+    yield calls
+    nlp_registry.clear()
+
+
+def test_model_is_loaded_once_across_threads(load_calls):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(nlp_registry.get_nlp())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert load_calls == [nlp_registry.DEFAULT_MODEL]
+    assert all(nlp is results[0] for nlp in results)
+
+
+def test_parser_and_engine_share_the_model(load_calls):
+    parser = ResumeParser(db_manager=None)
+    engine = MatchingEngine()
+    assert parser.load_nlp() is engine.load_nlp()
+    assert len(load_calls) == 1
+
+
+def test_blank_model_is_built_without_loading(load_calls):
+    nlp = nlp_registry.get_nlp(nlp_registry.FAST_MODEL)
+    assert nlp.pipe_names == ['sentencizer']
+    assert nlp_registry.get_nlp(nlp_registry.FAST_MODEL) is nlp
+    assert load_calls == []
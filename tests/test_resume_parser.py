@@ -1,10 +1,17 @@
 import sys
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
+import fitz
+import pytest
+import spacy
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app import nlp_registry, resume_parser
 from app.resume_parser import ResumeParser
+from app.skill_matcher import SkillMatcher
+from benchmarks.corpus import make_docx, make_pdf
 
 
 def test_resume_parser():
@@ -30,6 +37,117 @@ def test_resume_parser():
 
             print("\n")
 
+def _scanned_pdf(path, widths):
+    # Pages without a text layer, told apart by their width
+    pdf_document = fitz.open()
+    for width in widths:
+        pdf_document.new_page(width=width, height=100)
+    pdf_document.save(str(path))
+    return str(path)
+
+
+def _fake_ocr(image, config='', timeout=0):
+    if image.width == 500:
+        raise RuntimeError('Tesseract process timeout')
+    return f"page {image.width}"
+
+
+def _thread_ocr_pool(parser):
+    # OCR in threads of this process, where the fake tesseract is patched in
+    pool = ThreadPoolExecutor(max_workers=parser.ocr_workers)
+    parser._get_ocr_pool = lambda: pool
+    return pool
+
+
+def test_scanned_pages_are_ocred_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(resume_parser.pytesseract, 'image_to_string', _fake_ocr)
+    filepath = _scanned_pdf(tmp_path / 'scanned.pdf', [100, 200, 300, 400])
+
+    parser = ResumeParser(None, skill_matcher=SkillMatcher(), ocr_workers=2)
+    with _thread_ocr_pool(parser):
+        with open(filepath, 'rb') as f:
+            page_texts = parser.extract_pdf_pages(f.read())
+    # Rendered at 300 dpi, so page width in pixels is points * 300 / 72
+    assert page_texts == ['page 417', 'page 834', 'page 1250', 'page 1667']
+
+
+def test_ocr_timeout_and_page_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(resume_parser.pytesseract, 'image_to_string', _fake_ocr)
+    # 120pt renders 500px wide, which the fake OCR times out on
+    filepath = _scanned_pdf(tmp_path / 'scanned.pdf', [100, 120, 200])
+
+    parser = ResumeParser(None, skill_matcher=SkillMatcher(), ocr_workers=2, max_ocr_pages=2)
+    with _thread_ocr_pool(parser):
+        page_texts = parser.extract_pdf_pages(filepath)
+    assert page_texts == ['page 417', '', '']
+
+
+def test_ocr_pool_does_not_fork_the_server_process():
+    parser = ResumeParser(None, skill_matcher=SkillMatcher(), ocr_workers=1)
+    try:
+        assert parser._get_ocr_pool()._mp_context.get_start_method() in ('forkserver', 'spawn')
+    finally:
+        parser.close()
+
+
+def test_native_text_pages_skip_ocr(tmp_path, monkeypatch):
+    monkeypatch.setattr(resume_parser.pytesseract, 'image_to_string', _fake_ocr)
+    pdf_document = fitz.open()
+    pdf_document.new_page(width=300, height=300).insert_text((20, 50), "Jane Doe, senior data engineer")
+    pdf_document.new_page(width=100, height=100)
+
+    parser = ResumeParser(None, skill_matcher=SkillMatcher())
+    assert parser.parse_pdf(pdf_document.tobytes()) == 'Jane Doe, senior data engineer\npage 417'
+
+
+def test_extract_information_reads_sections_once():
+    parser = ResumeParser(None, skill_matcher=SkillMatcher())
+    parser.nlp = spacy.blank("en")
+    parser.nlp.add_pipe("sentencizer")
+
+    text = ("Jane Doe. Contact: jane@example.com, 555-123-4567. Experience: 5 years building python services. "
+            "Education: BS in Computer Science. Skills: sql, docker.")
+    info = parser.extract_information(text)
+
+    assert info['email'] == 'jane@example.com'
+    assert info['phone'] == '555-123-4567'
+    assert info['experience'] == "Experience: 5 years building python services."
+    assert info['education'] == "Education: BS in Computer Science."
+    assert info['skills'] == ['python', 'sql', 'docker']
+
+
+@pytest.mark.parametrize('filename', ['resume.pdf', 'resume.docx'])
+def test_sections_found_in_extracted_text(filename):
+    parser = ResumeParser(None, skill_matcher=SkillMatcher())
+    parser.nlp = spacy.blank("en")
+    parser.nlp.add_pipe("sentencizer")
+
+    text = ("Jane Doe\njane@example.com\n\nExperience\nSenior Data Engineer at Tech Corp\n"
+            "Built streaming pipelines in python\n\nEducation\nBSc Computer Science, University of Leeds\n\n"
+            "Skills\npython, sql")
+    source = make_pdf(text) if filename.endswith('.pdf') else make_docx(text)
+    info = parser.extract_information(parser.extract_text(source, filename))
+
+    assert info['name'] == 'Jane Doe'
+    assert info['experience'] == "Experience\nSenior Data Engineer at Tech Corp\nBuilt streaming pipelines in python"
+    assert info['education'] == "Education\nBSc Computer Science, University of Leeds"
+    assert info['skills'] == ['python', 'sql']
+
+
+def test_fast_mode_needs_no_statistical_model(monkeypatch):
+
+    def fail_load(name):
+        raise AssertionError(f"{name} should not be loaded in fast mode")
+
+    monkeypatch.setattr(nlp_registry.spacy, "load", fail_load)
+    parser = ResumeParser(None, skill_matcher=SkillMatcher(), mode='fast')
+    info = parser.extract_information("Jane Doe. Experience: python developer. Education: BSc.")
+    assert info['experience'] == "Experience: python developer."
+    assert info['skills'] == ['python']
+
+    with pytest.raises(ValueError):
+        ResumeParser(None, skill_matcher=SkillMatcher(), mode='turbo')
+
 
 if __name__ == "__main__":
-    test_resume_parser()
\ No newline at end of file
+    test_resume_parser()
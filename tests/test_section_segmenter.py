@@ -0,0 +1,61 @@
+import sys
+import os
+import spacy
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.section_segmenter import SectionSegmenter
+
+RESUME = ("Jane Doe. jane@example.com. Experience: data engineer at Tech Corp. Built pipelines in python. "
+          "Education: BS in Computer Science. Graduated with honours. Skills: python, sql. "
+          "Employment history continues. Led a team of five.")
+
+
+def _doc(text):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp(text)
+
+
+def test_segment_labels_every_sentence_once():
+    doc = _doc(RESUME)
+    sections = SectionSegmenter().segment(doc)
+
+    assert sections.text('contact') == "Jane Doe. jane@example.com."
+    assert sections.text('education') == "Education: BS in Computer Science. Graduated with honours."
+    assert sections.text('skills') == "Skills: python, sql."
+    assert sum(len(sentences) for sentences in sections.sentences.values()) == len(list(doc.sents))
+
+
+def test_spans_merge_consecutive_sentences():
+    sections = SectionSegmenter().segment(_doc(RESUME))
+
+    assert [span.text for span in sections.spans('experience')] == [
+        "Experience: data engineer at Tech Corp. Built pipelines in python.",
+        "Employment history continues. Led a team of five."
+    ]
+    assert sections.spans('missing') == []
+
+
+def test_custom_header_vocabulary():
+    segmenter = SectionSegmenter({'projects': ['side projects'], 'experience': ['career']}, default_section='summary')
+    sections = segmenter.segment(_doc("Curious engineer. Career: ten years at Acme. SIDE PROJECTS: a compiler."))
+
+    assert sections.text('summary') == "Curious engineer."
+    assert sections.text('experience') == "Career: ten years at Acme."
+    assert sections.text('projects') == "SIDE PROJECTS: a compiler."
+
+
+def test_keywords_inside_body_text_do_not_open_sections():
+    doc = _doc("Jane Doe. Experience: data engineer at Tech Corp. Built pipelines using modern technologies. "
+               "Partnered with the university hospital on a point of contact rota. Led a team of five.\n"
+               "Education\nBS in Computer Science.")
+    sections = SectionSegmenter().segment(doc)
+
+    assert sections.text('experience') == (
+        "Experience: data engineer at Tech Corp. Built pipelines using modern technologies. "
+        "Partnered with the university hospital on a point of contact rota. Led a team of five."
+    )
+    assert sections.text('education').strip() == "Education\nBS in Computer Science."
+    assert sections.text('skills') == ""
+    assert sections.text('contact') == "Jane Doe."
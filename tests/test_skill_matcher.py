@@ -0,0 +1,32 @@
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.skill_matcher import SkillMatcher, load_skill_taxonomy
+
+
+@pytest.fixture
+def skill_matcher():
+    return SkillMatcher()
+
+
+def test_finds_multi_word_and_symbol_skills(skill_matcher):
+    text = "Built Power BI dashboards; C++, Node.js/React and Machine Learning in Python."
+    assert skill_matcher.find(text) == ['power bi', 'c++', 'node.js', 'react', 'machine learning', 'python']
+
+
+def test_matches_on_token_boundaries_only(skill_matcher):
+    assert skill_matcher.find("Javascript developer, no Java, Rust or Scalability") == ['javascript', 'java']
+    assert skill_matcher.find("") == []
+
+
+def test_large_taxonomy_from_file(tmp_path):
+    taxonomy = tmp_path / 'skills.txt'
+    synthetic = [f'skill {i}' for i in range(10000)]
+    taxonomy.write_text('# synthetic taxonomy\n' + '\n'.join(synthetic + ['Apache Kafka', '']))
+    skill_matcher = SkillMatcher(load_skill_taxonomy(str(taxonomy)))
+
+    assert len(skill_matcher) == 10001
+    assert skill_matcher.find("Streams with apache kafka and skill 9999") == ['apache kafka', 'skill 9999']
@@ -0,0 +1,128 @@
+import sys
+import os
+import threading
+from datetime import timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import DatabaseManager
+from app.resume_parser import ResumeParser
+from app.task_queue import ResumeTaskQueue
+
+
+class FakeParser(ResumeParser):
+    # Real content hashing and cache lookups, canned parsing
+    def __init__(self, db_manager, result=None, block=None):
+        self.db_manager = db_manager
+        self.mode = 'full'
+        self.result = result if result is not None else {'name': 'Jane Doe', 'skills': ['python']}
+        self.block = block
+        self.calls = []
+
+    def parse_resume(self, source, filename):
+        if self.block is not None:
+            self.block.wait(5)
+        self.calls.append(filename)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def test_submit_parses_and_stores_resume(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'queue.db'))
+    queue = ResumeTaskQueue(db_manager, FakeParser(db_manager), workers=1)
+    task_id = queue.submit('resume.pdf', payload=b'resume.pdf')
+    queue.shutdown()
+
+    task = queue.get_status(task_id)
+    assert task['status'] == 'done'
+    assert task['progress'] == 100
+    resume = db_manager.get_resume(task['resume_id'])
+    assert resume['name'] == 'Jane Doe'
+    assert resume['skills'] == ['python']
+    assert db_manager.get_upload_payload(task_id) is None
+
+
+def test_failed_parse_marks_task_failed(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'queue.db'))
+    queue = ResumeTaskQueue(db_manager, FakeParser(db_manager, result=ValueError('corrupt file')), workers=1)
+    task_id = queue.submit('resume.pdf', payload=b'resume.pdf')
+    queue.shutdown()
+
+    task = queue.get_status(task_id)
+    assert task['status'] == 'failed'
+    assert task['error'] == 'corrupt file'
+    assert task['resume_id'] is None
+
+
+def test_queued_tasks_resume_after_restart(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'queue.db'))
+    queued_id = db_manager.add_upload_task('a.pdf', payload=b'a.pdf')
+    stale_id = db_manager.add_upload_task('b.pdf', filepath=str(tmp_path / 'b.pdf'))
+    (tmp_path / 'b.pdf').write_bytes(b'b.pdf')
+    assert db_manager.claim_upload_task(stale_id)
+
+    parser = FakeParser(db_manager)
+    queue = ResumeTaskQueue(db_manager, parser, workers=1, stale_after=timedelta(0))
+    queue.shutdown()
+
+    assert sorted(parser.calls) == ['a.pdf', 'b.pdf']
+    assert queue.get_status(queued_id)['status'] == 'done'
+    assert queue.get_status(stale_id)['status'] == 'done'
+
+
+def test_deferred_start_requeues_once_per_process(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'queue.db'))
+    queued_id = db_manager.add_upload_task('a.pdf', payload=b'a.pdf')
+
+    parser = FakeParser(db_manager)
+    queue = ResumeTaskQueue(db_manager, parser, workers=1, start=False)
+    assert queue.executor is None
+    assert queue.get_status(queued_id)['status'] == 'queued'
+
+    queue.start()
+    executor = queue.executor
+    queue.start()
+    assert queue.executor is executor
+    queue.shutdown()
+
+    assert parser.calls == ['a.pdf']
+    assert queue.get_status(queued_id)['status'] == 'done'
+
+
+def test_running_task_is_not_claimed_twice(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'queue.db'))
+    release = threading.Event()
+    parser = FakeParser(db_manager, block=release)
+    queue = ResumeTaskQueue(db_manager, parser, workers=2)
+    task_id = queue.submit('resume.pdf', payload=b'resume.pdf')
+    queue.executor.submit(queue._run, task_id)
+    release.set()
+    queue.shutdown()
+
+    assert parser.calls == ['resume.pdf']
+    assert queue.get_status(task_id)['status'] == 'done'
+
+
+def test_identical_upload_reuses_parsed_resume(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'queue.db'))
+    parser = FakeParser(db_manager)
+    queue = ResumeTaskQueue(db_manager, parser, workers=1)
+    first_id = queue.submit('first.pdf', payload=b'same bytes')
+    queue.shutdown()
+
+    queue = ResumeTaskQueue(db_manager, parser, workers=1)
+    second_id = queue.submit('second.pdf', payload=b'same bytes')
+    queue.shutdown()
+
+    assert parser.calls == ['first.pdf']
+    assert queue.get_status(second_id)['resume_id'] == queue.get_status(first_id)['resume_id']
+
+    # A new parser version invalidates the cache
+    parser.PARSER_VERSION = ResumeParser.PARSER_VERSION + 1
+    queue = ResumeTaskQueue(db_manager, parser, workers=1)
+    third_id = queue.submit('third.pdf', payload=b'same bytes')
+    queue.shutdown()
+
+    assert parser.calls == ['first.pdf', 'third.pdf']
+    assert queue.get_status(third_id)['resume_id'] != queue.get_status(first_id)['resume_id']